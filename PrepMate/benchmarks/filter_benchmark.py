@@ -0,0 +1,133 @@
+"""
+This module compares the time it takes to filter a large recipe corpus on the user information
+and preferences with the pure Python filters (the dietary and allergen scan of the corpus,
+the ingredient index and a check of the calories and time of every candidate) and with the
+NumPy FilterEngine. Both must return the same recipes.
+Run it from the PrepMate folder with: python -m benchmarks.filter_benchmark
+"""
+
+# Imports for this file
+import argparse
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+# Imports from this project
+from project.back_end.filter_engine import FilterEngine
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+from project.back_end.ingredient_index import IngredientIndex
+from project.back_end.recipe import VEGAN, VEGETARIAN, LACTOSE_FREE
+from project.back_end.recipe_corpus import RecipeCorpus, MISSING
+
+UNITS = ['g', 'ml', 'piece', 'tsp', 'tbsp']
+REQUIRED_FLAGS = VEGETARIAN
+ALLERGIES = ['Ingredient 3', 'Ingredient 17']
+SHOULD_NOT_HAVES = ['Ingredient 8']
+CALORIE_MIN_MAX = (300, 700)
+MAX_TIME = 60
+# Without must haves every recipe is a candidate, with one the index narrows them down
+SCENARIOS = {'no must haves': [], 'one must have': ['Ingredient 5']}
+
+
+def build_corpus(recipe_count: int, ingredients_per_recipe: int,
+                 vocabulary_size: int) -> RecipeCorpus:
+    """Builds a corpus of generated recipes, some without calories or preparation time"""
+    generator = random.Random(recipe_count)
+    vocabulary = [f'Ingredient {i}' for i in range(vocabulary_size)]
+    vocabulary_flags = generator.choices([VEGAN | VEGETARIAN | LACTOSE_FREE, VEGETARIAN, 0],
+                                         weights=[60, 38, 2], k=vocabulary_size)
+    corpus = RecipeCorpus()
+    for recipe_id in range(recipe_count):
+        codes = generator.sample(range(vocabulary_size), ingredients_per_recipe)
+        corpus.add(
+            recipe_id, f'Recipe {recipe_id}',
+            None if recipe_id % 50 == 0 else generator.randint(100, 1000),
+            None if recipe_id % 70 == 0 else generator.randint(5, 180),
+            None,
+            ((vocabulary[code], i + 1, UNITS[i % len(UNITS)], vocabulary_flags[code])
+             for i, code in enumerate(codes))
+        )
+    return corpus
+
+
+def python_filter(corpus: RecipeCorpus, index: IngredientIndex,
+                  must_haves: list[str]) -> list[int]:
+    """Filters the corpus like Suggestions did before the FilterEngine"""
+    user_positions = corpus.matching_positions(REQUIRED_FLAGS, ALLERGIES)
+    candidates = index.matching_positions(ingredient_dictionary.ids_of(must_haves),
+                                          ingredient_dictionary.ids_of(SHOULD_NOT_HAVES),
+                                          frozenset(user_positions))
+    positions = []
+    for position in candidates:
+        prep_time = corpus.prep_times[position]
+        if prep_time != MISSING and prep_time > MAX_TIME:
+            continue
+        calories = corpus.calories[position]
+        if calories != MISSING and not CALORIE_MIN_MAX[0] <= calories <= CALORIE_MIN_MAX[1]:
+            continue
+        positions.append(position)
+    return positions
+
+
+def numpy_filter(engine: FilterEngine, must_haves: list[str]) -> list[int]:
+    """Filters the corpus with the boolean masks of the FilterEngine"""
+    return engine.matching_positions(
+        required_flags=REQUIRED_FLAGS,
+        allergen_ids=ingredient_dictionary.ids_of(ALLERGIES),
+        must_have_ids=ingredient_dictionary.ids_of(must_haves),
+        should_not_have_ids=ingredient_dictionary.ids_of(SHOULD_NOT_HAVES),
+        calorie_min_max=CALORIE_MIN_MAX,
+        max_time=MAX_TIME
+    )
+
+
+def best_time(repeat: int, function: Callable[..., list[int]],
+              *args: Any) -> tuple[float, list[int]]:
+    """Returns the fastest of a few runs of function(*args), in seconds, and its result"""
+    times = []
+    result: list[int] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main() -> None:
+    """Runs the benchmark and prints the setup and filter time of both filters"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--ingredients', type=int, default=10)
+    parser.add_argument('--vocabulary', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    arguments = parser.parse_args()
+
+    print(f'{"recipes":>9} {"scenario":>14} {"filter":>7} {"setup (s)":>10} '
+          f'{"filter (s)":>11} {"matches":>8}')
+    for size in arguments.sizes:
+        corpus = build_corpus(size, arguments.ingredients, arguments.vocabulary)
+
+        start = time.perf_counter()
+        index = IngredientIndex(corpus)
+        index_setup = time.perf_counter() - start
+        start = time.perf_counter()
+        engine = FilterEngine(corpus)
+        engine_setup = time.perf_counter() - start
+
+        for scenario, must_haves in SCENARIOS.items():
+            python_time, python_result = best_time(
+                arguments.repeat, python_filter, corpus, index, must_haves)
+            numpy_time, numpy_result = best_time(
+                arguments.repeat, numpy_filter, engine, must_haves)
+            if python_result != numpy_result:
+                raise AssertionError(f'The filters disagree for {size} recipes, {scenario}')
+            print(f'{size:>9} {scenario:>14} {"python":>7} {index_setup:>10.3f} '
+                  f'{python_time:>11.4f} {len(python_result):>8}')
+            print(f'{size:>9} {scenario:>14} {"numpy":>7} {engine_setup:>10.3f} '
+                  f'{numpy_time:>11.4f} {len(numpy_result):>8}   '
+                  f'{python_time / numpy_time:.1f}x faster')
+
+
+if __name__ == '__main__':
+    main()
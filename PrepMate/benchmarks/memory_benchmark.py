@@ -0,0 +1,123 @@
+"""
+This module measures how much memory a large recipe collection takes in each representation:
+plain objects with a __dict__ (the previous Recipe and Ingredient classes), the slotted
+Recipe and Ingredient classes and the columnar RecipeCorpus.
+Run it from the PrepMate folder with: python -m benchmarks.memory_benchmark
+"""
+
+# Imports for this file
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Callable
+
+# Imports from this project
+from project.back_end.ingredient import Ingredient
+from project.back_end.recipe import Recipe
+from project.back_end.recipe_corpus import RecipeCorpus
+
+UNITS = ['g', 'ml', 'piece', 'tsp', 'tbsp']
+
+
+class DictIngredient:     # pylint: disable=too-few-public-methods
+    """The ingredient layout before slots, with a __dict__ per object"""
+    def __init__(self, name: str, **kwargs) -> None:
+        self.name = name
+        self.quantity = kwargs.get("quantity", 0)
+        self.unit = kwargs.get("unit", None)
+        self.is_vegan = kwargs.get('is_vegan', None)
+        self.is_vegetarian = kwargs.get('is_vegetarian', None)
+        self.is_lactose_free = kwargs.get('is_lactose_free', None)
+
+
+class DictRecipe:     # pylint: disable=too-few-public-methods
+    """The recipe layout before slots, with a __dict__ per object"""
+    def __init__(self, name: str, **kwargs) -> None:
+        self.name = name
+        self.recipe_id = kwargs.get('recipe_id', None)
+        self.ingredients = kwargs.get('ingredients', [])
+        self.calories = kwargs.get('calories', None)
+        self.prep_time = kwargs.get('prep_time', None)
+        self.instructions: list[str] = []
+
+
+def recipe_values(recipe_count: int, ingredients_per_recipe: int, vocabulary_size: int):
+    """Yields the raw values of generated recipes, ingredient names repeat like in real data"""
+    vocabulary = [f'Ingredient {i}' for i in range(vocabulary_size)]
+    for recipe_id in range(recipe_count):
+        ingredients = [
+            (vocabulary[(recipe_id * 7 + i * 13) % vocabulary_size], i + 1,
+             UNITS[i % len(UNITS)], i % 2 == 0)
+            for i in range(ingredients_per_recipe)
+        ]
+        yield recipe_id, f'Recipe {recipe_id}', 200 + recipe_id % 800, 5 + recipe_id % 120, \
+            ingredients
+
+
+def build_dict_objects(values) -> list:
+    """Builds the collection with the previous, dict based classes"""
+    return [
+        DictRecipe(name, recipe_id=recipe_id, calories=calories, prep_time=prep_time,
+                   ingredients=[DictIngredient(ingredient, quantity=quantity, unit=unit,
+                                               is_vegan=vegan, is_vegetarian=True,
+                                               is_lactose_free=True)
+                                for ingredient, quantity, unit, vegan in ingredients])
+        for recipe_id, name, calories, prep_time, ingredients in values
+    ]
+
+
+def build_slotted_objects(values) -> list:
+    """Builds the collection with the slotted Recipe and Ingredient classes"""
+    return [
+        Recipe(name, recipe_id=recipe_id, calories=calories, prep_time=prep_time,
+               ingredients=[Ingredient(ingredient, quantity=quantity, unit=unit,
+                                       is_vegan=vegan, is_vegetarian=True, is_lactose_free=True)
+                            for ingredient, quantity, unit, vegan in ingredients])
+        for recipe_id, name, calories, prep_time, ingredients in values
+    ]
+
+
+def build_corpus(values) -> RecipeCorpus:
+    """Builds the collection as a RecipeCorpus"""
+    corpus = RecipeCorpus()
+    for recipe_id, name, calories, prep_time, ingredients in values:
+        corpus.add(recipe_id, name, calories, prep_time, None,
+                   ((ingredient, quantity, unit, RecipeCorpus.flags_of(vegan, True, True))
+                    for ingredient, quantity, unit, vegan in ingredients))
+    return corpus
+
+
+def measure(build: Callable, values) -> int:
+    """Returns the number of bytes that are still allocated for the built collection"""
+    gc.collect()
+    tracemalloc.start()
+    collection = build(values)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del collection
+    return size
+
+
+def main() -> None:
+    """Runs the benchmark and prints the memory use of every representation"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=50_000)
+    parser.add_argument('--ingredients', type=int, default=10)
+    parser.add_argument('--vocabulary', type=int, default=2_000)
+    arguments = parser.parse_args()
+
+    print(f'{arguments.recipes} recipes with {arguments.ingredients} ingredients each')
+    baseline = None
+    for label, build in [('dict objects', build_dict_objects),
+                         ('slotted objects', build_slotted_objects),
+                         ('recipe corpus', build_corpus)]:
+        values = list(recipe_values(arguments.recipes, arguments.ingredients,
+                                    arguments.vocabulary))
+        size = measure(build, values)
+        baseline = baseline or size
+        print(f'{label:>16}: {size / 2 ** 20:8.1f} MiB ({size / baseline:6.1%})')
+
+
+if __name__ == '__main__':
+    main()
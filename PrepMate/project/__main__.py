@@ -2,7 +2,7 @@
 
 import sys
 
-from PySide6.QtWidgets import QApplication, QMainWindow
+from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox
 from project.front_end.mainmenu_window import MainMenuWindow
 from project.front_end.userinformation_window import UserInformationWindow
 from project.front_end.shoppinglist_window import ShoppingListWindow
@@ -10,6 +10,8 @@ from project.front_end.suggestions_window import SuggestionsWindow
 from project.front_end.userpreferences_window import UserPreferencesWindow
 from project.front_end.mealplanning_window import MealPlanningWindow
 from project.front_end.addrecipe_window import AddRecipeWindow
+from project.front_end.pendingingredients_window import PendingIngredientsWindow
+from project.front_end.async_database import AsyncDatabase
 from project.back_end.user import User
 from project.back_end.database import Database
 
@@ -32,6 +34,15 @@ class PrepMateWindow(QMainWindow):
         except IndexError:
             self.database.add_user_info(User())
 
+        # Windows run their queries through the async database, so the GUI does not freeze
+        self.async_database = AsyncDatabase("PrepMate.db")
+        self.async_database.query_failed.connect(self.show_database_error)
+        self.app.aboutToQuit.connect(self.async_database.shutdown)
+
+    def show_database_error(self, error: Exception) -> None:
+        """Method to tell the user that a query on the worker thread failed."""
+        QMessageBox.warning(self, "Database error", f"Something went wrong: {error}")
+
     def to_userinformationwindow(self) -> None:
         """
         Method to create an userinfo widget, and set it as the central widget,
@@ -81,6 +92,13 @@ class PrepMateWindow(QMainWindow):
         """
         self.setCentralWidget(AddRecipeWindow(self).addrecipe_scroll)
 
+    def to_pendingingredientswindow(self) -> None:
+        """
+        Method to create a pending ingredients widget, and set it as the central widget,
+        thus displaying it on the PrepMate Window.
+        """
+        self.setCentralWidget(PendingIngredientsWindow(self))
+
 
 
 if __name__ == "__main__":
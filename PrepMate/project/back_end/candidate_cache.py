@@ -0,0 +1,76 @@
+"""This module contains the CandidateCache class"""
+
+# Imports for this file
+from collections.abc import Sequence
+from typing import Any
+
+# Imports from this project
+from project.back_end.lru_cache import LRUCache
+from project.back_end.recipe import Recipe
+from project.back_end.user import User
+
+
+class CandidateCache(LRUCache[tuple, list[Recipe]]):
+    """This class is a size-bounded LRU cache for the recipes that fit a user profile and
+    preferences. Every entry belongs to a data version of the database, and when the version
+    changes (recipes or ingredient info were changed) the whole cache is emptied"""
+    def __init__(self, maxsize: int = 32) -> None:
+        super().__init__(maxsize)
+        self.data_version: int | None = None
+
+    @staticmethod
+    def key_of(user: User, preferences: Sequence | None = None) -> tuple:
+        """Returns the key of the user profile and the preferences (must haves, should not
+        haves, calorie range and maximum time). Names are casefolded and their order doesn't
+        matter, so profiles and preferences that filter the same recipes have the same key"""
+        must_haves, should_not_haves, calorie_min_max, max_time = (
+            preferences if preferences is not None else ([], [], None, None)
+        )
+        return (
+            bool(user.is_vegan),
+            bool(user.is_vegetarian),
+            bool(user.is_lactose_intolerant),
+            frozenset(allergy.casefold() for allergy in user.allergies),
+            frozenset(name.casefold() for name in must_haves),
+            frozenset(name.casefold() for name in should_not_haves),
+            None if calorie_min_max is None else tuple(calorie_min_max),
+            max_time
+        )
+
+    def freeze(self, value: list[Recipe]) -> Any:
+        return tuple(value)
+
+    def thaw(self, stored: Any) -> list[Recipe]:
+        return list(stored)
+
+    def check_version(self, data_version: int | None) -> bool:
+        """Empties the cache if the data version changed, returns whether it is the same"""
+        if data_version is None or data_version == self.data_version:
+            return True
+        self.invalidate()
+        self.data_version = data_version
+        return False
+
+    def get(self, key: tuple, data_version: int | None = None) -> list[Recipe] | None:
+        """Returns a copy of the cached recipes, or None if they are not cached
+        for this data version"""
+        with self._lock:
+            self.check_version(data_version)
+            return super().get(key)
+
+    def related(self, key: tuple, data_version: int) -> tuple[tuple, list[Recipe]] | None:
+        """Returns the most recently used key with the same preferences but another user
+        profile and a copy of its recipes, or None if there is none for this data version"""
+        with self._lock:
+            if not self.check_version(data_version):
+                return None
+            for cached_key in reversed(self._entries):
+                if cached_key[4:] == key[4:]:
+                    return cached_key, self.thaw(self._entries[cached_key])
+            return None
+
+    def put(self, key: tuple, value: list[Recipe], data_version: int | None = None) -> None:
+        """Stores the recipes, evicting the least recently used entry if full"""
+        with self._lock:
+            self.check_version(data_version)
+            super().put(key, value)
@@ -0,0 +1,76 @@
+# pylint: disable=too-few-public-methods
+"""This module keeps the SQLite connections that are shared by all Database objects"""
+
+# Imports for this file
+import atexit
+import os
+import sqlite3
+import threading
+from typing import Any
+
+
+class SharedConnection(sqlite3.Connection):
+    """This class is a sqlite3 connection that also holds the state that
+    all Database objects using the connection have to share"""
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.transaction_depth: int = 0
+        # Ingredient dictionary ids inserted by this connection that are not committed yet
+        self.pending_ingredient_ids: dict[str, int] = {}
+
+
+class SharedState(dict[str, Any]):
+    """This class holds the caches of one database file, shared by the connections of all
+    threads, so a change made on one thread invalidates the caches of the others too.
+    The lock guards creating the state and anything that must only happen once per file"""
+    def __init__(self) -> None:
+        super().__init__()
+        self.lock = threading.RLock()
+
+
+class ConnectionRegistry:
+    """This class hands out one shared connection per database file and thread, and one
+    shared state per database file.
+    Every connection is tuned for concurrent use: WAL journaling lets readers continue
+    while another connection writes, and the page cache and memory map avoid disk reads"""
+    def __init__(self, cache_size_kib: int = 16384, mmap_size: int = 64 * 1024 * 1024) -> None:
+        self.cache_size_kib: int = cache_size_kib
+        self.mmap_size: int = mmap_size
+        self._connections: dict[tuple[str, int], SharedConnection] = {}
+        self._shared_states: dict[str, SharedState] = {}
+        self._lock = threading.Lock()
+
+    def get_connection(self, db_path: str) -> SharedConnection:
+        """Returns the connection to the database file for the current thread,
+        opening and configuring it the first time"""
+        key = (os.path.abspath(db_path), threading.get_ident())
+        with self._lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = sqlite3.connect(key[0], factory=SharedConnection, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode = WAL')
+                conn.execute('PRAGMA synchronous = NORMAL')
+                conn.execute(f'PRAGMA cache_size = -{self.cache_size_kib}')
+                conn.execute(f'PRAGMA mmap_size = {self.mmap_size}')
+                self._connections[key] = conn
+            return conn
+
+    def get_shared_state(self, db_path: str) -> SharedState:
+        """Returns the state that all threads share for the database file"""
+        with self._lock:
+            return self._shared_states.setdefault(os.path.abspath(db_path), SharedState())
+
+    def close(self, db_path: str | None = None) -> None:
+        """Closes the connections to the database file, or all connections if no file is given,
+        and forgets their shared state"""
+        with self._lock:
+            for key in list(self._connections):
+                if db_path is None or key[0] == os.path.abspath(db_path):
+                    self._connections.pop(key).close()
+            for path in list(self._shared_states):
+                if db_path is None or path == os.path.abspath(db_path):
+                    del self._shared_states[path]
+
+
+registry = ConnectionRegistry()
+atexit.register(registry.close)
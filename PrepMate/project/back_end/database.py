@@ -1,25 +1,375 @@
+# pylint: disable=too-many-public-methods, too-many-instance-attributes, too-many-arguments
+# pylint: disable=too-many-lines
 """This module is used for everything related to the database"""
 
 # Imports for this file
+import csv
+import itertools
 import os
+import re
 import sqlite3
-import pandas as pd
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 
 # Imports from this project
-from project.back_end.recipe import Recipe
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN, LACTOSE_FREE
+from project.back_end.recipe_corpus import RecipeCorpus
 from project.back_end.ingredient import Ingredient
 from project.back_end.user import User
+from project.back_end.ingredient_info_cache import IngredientInfoCache
+from project.back_end.instruction_cache import InstructionCache
+from project.back_end.instruction_store import InstructionStore
+from project.back_end.candidate_cache import CandidateCache
+from project.back_end.trigram_index import TrigramIndex
+from project.back_end.connection_registry import registry, SharedState
 
 
 class Database:
     """This class is used to create SQLite3 database files and manage information stored in them."""
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, ingredient_cache_size: int = 1024) -> None:
         """Creates a SQLite database if it does not exist and store it in the project folder"""
         self.project_folder = os.path.dirname(__file__)
         self.db_path = os.path.join(self.project_folder, filename)
 
-        self.conn = sqlite3.connect(self.db_path)
+        # All Database objects of a thread share one connection to the file,
+        # and all threads share the caches of the file
+        self.conn = registry.get_connection(self.db_path)
         self.cursor = self.conn.cursor()
+        self.shared_state: SharedState = registry.get_shared_state(self.db_path)
+        self.instruction_store: InstructionStore = InstructionStore.for_database(self.db_path)
+        with self.shared_state.lock:
+            self.ingredient_info_cache: IngredientInfoCache = self.shared_state.setdefault(
+                'ingredient_info_cache', IngredientInfoCache(ingredient_cache_size)
+            )
+            self.instruction_cache: InstructionCache = self.shared_state.setdefault(
+                'instruction_cache', InstructionCache()
+            )
+            self.candidate_cache: CandidateCache = self.shared_state.setdefault(
+                'candidate_cache', CandidateCache()
+            )
+            # Committed ids of the casefolded names in the ingredient_dictionary table
+            self.ingredient_dictionary_ids: dict[str, int] = self.shared_state.setdefault(
+                'ingredient_dictionary_ids', {}
+            )
+            if not self.shared_state.get('is_migrated'):
+                self.migrate()
+                self.shared_state['is_migrated'] = True
+
+    def close(self) -> None:
+        """Closes the shared connection and the instruction store of the database file"""
+        registry.close(self.db_path)
+        InstructionStore.close_for_database(self.db_path)
+
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """Groups everything done inside the with-block into one transaction.
+        The mutators don't commit inside the block, the changes are committed once at the end
+        or rolled back when an error occurs. Nested blocks join the outer transaction"""
+        is_outermost = self.conn.transaction_depth == 0
+        if is_outermost and not self.conn.in_transaction:
+            self.conn.execute('BEGIN')
+
+        self.conn.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if is_outermost:
+                self.conn.rollback()
+                # Ids added during the transaction no longer exist
+                self.conn.pending_ingredient_ids.clear()
+            raise
+        else:
+            if is_outermost:
+                self.conn.commit()
+                self.publish_ingredient_ids()
+        finally:
+            self.conn.transaction_depth -= 1
+
+    def commit(self) -> None:
+        """Commits the changes, unless they are part of a transaction block"""
+        if self.conn.transaction_depth == 0:
+            self.conn.commit()
+            self.publish_ingredient_ids()
+
+    def publish_ingredient_ids(self) -> None:
+        """Shares the committed ingredient dictionary ids of this connection with all threads"""
+        self.ingredient_dictionary_ids.update(self.conn.pending_ingredient_ids)
+        self.conn.pending_ingredient_ids.clear()
+
+    def migrate(self) -> None:
+        """Brings an existing database up to the latest schema. The number of applied
+        migrations is stored in PRAGMA user_version, so each one only runs once"""
+        migrations = [
+            self.migration_create_schema,
+            self.migration_fix_column_types,
+            self.migration_unique_shopping_list,
+            self.migration_typed_calories_and_categories,
+            self.create_table_pending_ingredients,
+            self.migration_pack_instruction_files,
+            self.migration_add_dietary_flags,
+            self.migration_ingredient_dictionary,
+            self.migration_recipe_filter_indexes,
+            self.create_table_data_version,
+            self.migration_queue_unknown_ingredients
+        ]
+
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for new_version, migration in enumerate(migrations, start=1):
+            if version < new_version:
+                with self.transaction():
+                    migration()
+                    self.conn.execute(f'PRAGMA user_version = {new_version}')
+
+    def migration_create_schema(self) -> None:
+        """Migration 1: creates all tables and their indexes"""
+        self.create_table_recipes()
+        self.create_table_ingredients()
+        self.create_table_shopping_list()
+        self.create_table_allergies()
+        self.create_table_dietary_restrictions()
+        self.create_table_meal_plans()
+        self.create_table_calories_and_categories()
+        self.create_indexes()
+
+    def migration_fix_column_types(self) -> None:
+        """Migration 2: rebuilds the tables that were created with the misspelled INTIGER type"""
+        rebuilds = [
+            ('recipes', self.create_table_recipes, 'id, name, calories, prep_time'),
+            ('ingredients', self.create_table_ingredients, 'id, recipe_id, name, quantity, unit'),
+            ('shopping_list', self.create_table_shopping_list, 'id, name, quantity, unit')
+        ]
+
+        # Keep references to the renamed tables pointing to the original names
+        self.cursor.execute('PRAGMA legacy_alter_table = ON')
+        for table, create_table, columns in rebuilds:
+            self.cursor.execute(f'PRAGMA table_info({table})')
+            if 'INTIGER' not in [column[2] for column in self.cursor.fetchall()]:
+                continue
+
+            # SQLite cannot change a column type, so the table is copied into a new one
+            self.cursor.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+            create_table()
+            self.cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_old'
+            )
+            self.cursor.execute(f'DROP TABLE {table}_old')
+        self.cursor.execute('PRAGMA legacy_alter_table = OFF')
+
+        self.create_indexes()
+
+    def migration_unique_shopping_list(self) -> None:
+        """Migration 3: merges duplicate shopping list rows and makes (name, unit) unique"""
+        self.cursor.execute("UPDATE shopping_list SET unit = '' WHERE unit IS NULL")
+        self.cursor.execute('''
+            UPDATE shopping_list
+            SET quantity = (
+                SELECT SUM(duplicate.quantity)
+                FROM shopping_list AS duplicate
+                WHERE duplicate.name = shopping_list.name AND duplicate.unit = shopping_list.unit
+            )
+            WHERE id IN (SELECT MIN(id) FROM shopping_list GROUP BY name, unit)
+        ''')
+        self.cursor.execute(
+            'DELETE FROM shopping_list WHERE id NOT IN '
+            '(SELECT MIN(id) FROM shopping_list GROUP BY name, unit)'
+        )
+        self.cursor.execute('DROP INDEX IF EXISTS idx_shopping_list_name_unit')
+        self.cursor.execute(
+            'CREATE UNIQUE INDEX idx_shopping_list_name_unit ON shopping_list (name, unit)'
+        )
+
+    def migration_typed_calories_and_categories(self) -> None:
+        """Migration 4: converts the calories_and_categories table that pandas created
+        to numeric columns and makes FoodItem unique, so the csv import can upsert into it"""
+        self.cursor.execute('PRAGMA table_info(calories_and_categories)')
+        column_types = {column[1]: column[2] for column in self.cursor.fetchall()}
+        if column_types.get('Cals_per100grams') != 'INTEGER':
+            # CAST keeps the leading number of strings like '70 cal'
+            self.cursor.execute('PRAGMA legacy_alter_table = ON')
+            self.cursor.execute(
+                'ALTER TABLE calories_and_categories RENAME TO calories_and_categories_old'
+            )
+            self.create_table_calories_and_categories()
+            self.cursor.execute('''
+                INSERT INTO calories_and_categories
+                SELECT
+                    FoodCategory,
+                    FoodItem,
+                    per100grams,
+                    CAST(Cals_per100grams AS INTEGER),
+                    CAST(KJ_per100grams AS INTEGER),
+                    Vegan,
+                    Vegetarian,
+                    LactoseFree
+                FROM calories_and_categories_old
+                WHERE FoodItem IS NOT NULL
+                ORDER BY rowid
+            ''')
+            self.cursor.execute('DROP TABLE calories_and_categories_old')
+            self.cursor.execute('PRAGMA legacy_alter_table = OFF')
+
+        # Only the first row of an ingredient was ever used by the lookups
+        self.cursor.execute('''
+            DELETE FROM calories_and_categories
+            WHERE rowid NOT IN (
+                SELECT MIN(rowid) FROM calories_and_categories GROUP BY FoodItem COLLATE NOCASE
+            )
+        ''')
+        self.cursor.execute('DROP INDEX IF EXISTS idx_calories_and_categories_food_item')
+        self.cursor.execute('''
+            CREATE UNIQUE INDEX idx_calories_and_categories_food_item
+            ON calories_and_categories (FoodItem COLLATE NOCASE)
+        ''')
+
+    def migration_pack_instruction_files(self) -> None:
+        """Migration 6: copies the instructions of the recipes from the text files in
+        instructions_files into the instruction store. Files are matched on their name without
+        the extension, so files with a mistyped extension are found too"""
+        instructions_folder = os.path.join(self.project_folder, 'instructions_files')
+        if not os.path.isdir(instructions_folder):
+            return
+
+        files_by_name = {
+            os.path.splitext(file_name)[0]: os.path.join(instructions_folder, file_name)
+            for file_name in sorted(os.listdir(instructions_folder))
+        }
+        for recipe_id, name in self.conn.execute('SELECT id, name FROM recipes').fetchall():
+            file_path = files_by_name.get(name)
+            if file_path is None or recipe_id in self.instruction_store:
+                continue
+            with open(file_path, encoding='utf-8') as f:
+                self.instruction_store.put(recipe_id, f.readlines())
+
+    def migration_add_dietary_flags(self) -> None:
+        """Migration 7: adds the dietary_flags column to the recipes table and fills it in"""
+        self.cursor.execute('PRAGMA table_info(recipes)')
+        if 'dietary_flags' not in [column[1] for column in self.cursor.fetchall()]:
+            self.cursor.execute('ALTER TABLE recipes ADD COLUMN dietary_flags INTEGER')
+        self.refresh_dietary_flags()
+
+    def refresh_dietary_flags(self, condition: str = 'TRUE', parameters: tuple = ()) -> None:
+        """Recomputes the dietary bitmask of the recipes that match the SQL condition. A flag is
+        only set if all ingredients of the recipe have it, ingredients without info have none.
+        The change is committed with the change it belongs to"""
+        update_cmd = f'''
+            UPDATE recipes
+            SET dietary_flags = (
+                SELECT
+                    COALESCE(MIN(COALESCE(info.Vegan, 0)), 1) * {VEGAN}
+                    + COALESCE(MIN(COALESCE(info.Vegetarian, 0)), 1) * {VEGETARIAN}
+                    + COALESCE(MIN(COALESCE(info.LactoseFree, 0)), 1) * {LACTOSE_FREE}
+                FROM ingredients
+                LEFT JOIN calories_and_categories AS info
+                    ON info.FoodItem = ingredients.name COLLATE NOCASE
+                WHERE ingredients.recipe_id = recipes.id
+            )
+            WHERE {condition}
+        '''
+        self.cursor.execute(update_cmd, parameters)
+
+    def migration_queue_unknown_ingredients(self) -> None:
+        """Migration 11: queues the unknown ingredients of the stored recipes, which used to be
+        queued when a recipe was loaded"""
+        self.queue_unknown_ingredients()
+
+    def queue_unknown_ingredients(self, condition: str = 'TRUE', parameters: tuple = ()) -> None:
+        """Queues the ingredients without info of the recipes that match the SQL condition on
+        the ingredients table in one statement, so loading recipes never writes"""
+        queue_cmd = f'''
+            INSERT OR IGNORE INTO pending_ingredients (name)
+            SELECT DISTINCT ingredients.name
+            FROM ingredients
+            LEFT JOIN calories_and_categories AS info
+                ON info.FoodItem = ingredients.name COLLATE NOCASE
+            WHERE info.FoodItem IS NULL AND {condition}
+        '''
+        self.cursor.execute(queue_cmd, parameters)
+
+    def migration_ingredient_dictionary(self) -> None:
+        """Migration 8: creates the ingredient dictionary, makes the ingredients and the
+        shopping list refer to it and aggregates the shopping list per ingredient id and unit"""
+        self.create_table_ingredient_dictionary()
+        for table in ('ingredients', 'shopping_list'):
+            self.cursor.execute(f'PRAGMA table_info({table})')
+            if 'ingredient_id' not in [column[1] for column in self.cursor.fetchall()]:
+                self.cursor.execute(f'ALTER TABLE {table} ADD COLUMN ingredient_id INTEGER '
+                                    f'REFERENCES ingredient_dictionary (id)')
+
+            names = [row[0] for row in self.conn.execute(
+                f'SELECT DISTINCT name FROM {table} WHERE ingredient_id IS NULL'
+            ).fetchall()]
+            self.cursor.executemany(
+                f'UPDATE {table} SET ingredient_id = ? WHERE name = ? AND ingredient_id IS NULL',
+                zip(self.ingredient_ids(names), names)
+            )
+
+        # Names that only differ in case are now the same shopping list item
+        self.cursor.execute('''
+            UPDATE shopping_list
+            SET quantity = (
+                SELECT SUM(duplicate.quantity)
+                FROM shopping_list AS duplicate
+                WHERE duplicate.ingredient_id = shopping_list.ingredient_id
+                    AND duplicate.unit = shopping_list.unit
+            )
+            WHERE id IN (SELECT MIN(id) FROM shopping_list GROUP BY ingredient_id, unit)
+        ''')
+        self.cursor.execute(
+            'DELETE FROM shopping_list WHERE id NOT IN '
+            '(SELECT MIN(id) FROM shopping_list GROUP BY ingredient_id, unit)'
+        )
+        self.cursor.execute('DROP INDEX IF EXISTS idx_shopping_list_name_unit')
+        self.cursor.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_shopping_list_ingredient_unit '
+            'ON shopping_list (ingredient_id, unit)'
+        )
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_ingredients_ingredient_id '
+            'ON ingredients (ingredient_id)'
+        )
+
+    def migration_recipe_filter_indexes(self) -> None:
+        """Migration 9: indexes the recipe columns that query_recipes filters on"""
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_recipes_calories ON recipes (calories)')
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_recipes_prep_time ON recipes (prep_time)'
+        )
+
+    def ingredient_ids(self, names: Iterable[str]) -> list[int]:
+        """Returns the ids of the ingredient names in the ingredient_dictionary table,
+        names are compared casefolded and new names are added"""
+        ids = []
+        for name in names:
+            key = name.casefold()
+            ingredient_id = self.ingredient_dictionary_ids.get(key)
+            if ingredient_id is None:
+                ingredient_id = self.conn.pending_ingredient_ids.get(key)
+            if ingredient_id is None:
+                self.cursor.execute(
+                    'INSERT INTO ingredient_dictionary (name) VALUES (?) '
+                    'ON CONFLICT (name) DO UPDATE SET name = excluded.name RETURNING id',
+                    (key,)
+                )
+                ingredient_id = self.conn.pending_ingredient_ids[key] = (
+                    self.cursor.fetchall()[0][0]
+                )
+            ids.append(ingredient_id)
+        return ids
+
+    def add_instructions(self, recipe_id: int, instructions: list[str]) -> None:
+        """Writes the instructions of the recipe to the instruction store"""
+        self.instruction_store.put(recipe_id, instructions)
+        self.instruction_cache.invalidate(recipe_id)
+
+    def create_indexes(self) -> None:
+        """Creates the indexes used by the lookups, if they don't exist already"""
+        index_sqls = [
+            'CREATE INDEX IF NOT EXISTS idx_ingredients_recipe_id ON ingredients (recipe_id)',
+            'CREATE INDEX IF NOT EXISTS idx_meal_plans_date_saved ON meal_plans (date_saved)'
+        ]
+        for index_sql in index_sqls:
+            self.cursor.execute(index_sql)
+        self.commit()
 
     def create_table_recipes(self) -> None:
         """creates the recipes table if it doesn't exist already"""
@@ -27,12 +377,25 @@ class Database:
 		    CREATE TABLE IF NOT EXISTS recipes (
 				id INTEGER PRIMARY KEY AUTOINCREMENT,
 		    	name TEXT NOT NULL,
-		    	calories INTIGER,
-		    	prep_time INTEGER
+		    	calories INTEGER,
+		    	prep_time INTEGER,
+		    	dietary_flags INTEGER
 			)
 		'''
         self.cursor.execute(query)
-        self.conn.commit()
+        self.commit()
+
+    def create_table_ingredient_dictionary(self) -> None:
+        """creates the table with an id for every casefolded ingredient name,
+        if it doesn't exist already"""
+        table_sql = '''
+            CREATE TABLE IF NOT EXISTS ingredient_dictionary (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        '''
+        self.cursor.execute(table_sql)
+        self.commit()
 
     def create_table_ingredients(self) -> None:
         """creates the ingredients table if it doesn't exist already"""
@@ -41,14 +404,17 @@ class Database:
 				id INTEGER PRIMARY KEY AUTOINCREMENT,
                 recipe_id INTEGER NOT NULL,
 		        name TEXT NOT NULL,
-		        quantity INTIGER,
+		        quantity INTEGER,
 		        unit TEXT,
+		        ingredient_id INTEGER,
                 FOREIGN KEY (recipe_id)
-				REFERENCES lists (id)
+				REFERENCES recipes (id),
+		        FOREIGN KEY (ingredient_id)
+				REFERENCES ingredient_dictionary (id)
 			)
 		'''
         self.cursor.execute(table_sql)
-        self.conn.commit()
+        self.commit()
 
     def create_table_shopping_list(self) -> None:
         """creates the shopping list table if it doesn't exist already"""
@@ -56,12 +422,13 @@ class Database:
 		    CREATE TABLE IF NOT EXISTS shopping_list (
 		        id INTEGER PRIMARY KEY AUTOINCREMENT,
 		        name TEXT NOT NULL,
-		        quantity INTIGER,
-		        unit TEXT
+		        quantity INTEGER,
+		        unit TEXT,
+		        ingredient_id INTEGER REFERENCES ingredient_dictionary (id)
 			)
 		'''
         self.cursor.execute(table_sql)
-        self.conn.commit()
+        self.commit()
 
     def create_table_allergies(self) -> None:
         """creates the allergies table if it doesn't exist already"""
@@ -73,7 +440,7 @@ class Database:
 			)
 		'''
         self.cursor.execute(table_sql)
-        self.conn.commit()
+        self.commit()
 
     def create_table_dietary_restrictions(self) -> None:
         """creates the dietary_restrictions table if it doesn't exist already"""
@@ -87,7 +454,7 @@ class Database:
 		    )
 		'''
         self.cursor.execute(table_sql)
-        self.conn.commit()
+        self.commit()
 
     def create_table_meal_plans(self) -> None:
         """Creates the meal_plans table if it doesn't exist already"""
@@ -99,106 +466,176 @@ class Database:
             )
         '''
         self.cursor.execute(table_sql)
-        self.conn.commit()
+        self.commit()
+
+    def create_table_calories_and_categories(self) -> None:
+        """Creates the calories_and_categories table if it doesn't exist already"""
+
+        table_sql = '''
+            CREATE TABLE IF NOT EXISTS calories_and_categories (
+            FoodCategory TEXT,
+            FoodItem TEXT NOT NULL,
+            per100grams TEXT,
+            Cals_per100grams INTEGER,
+            KJ_per100grams INTEGER,
+            Vegan BOOLEAN,
+            Vegetarian BOOLEAN,
+            LactoseFree BOOLEAN
+            )
+        '''
+        self.cursor.execute(table_sql)
+        self.commit()
+
+    def create_table_pending_ingredients(self) -> None:
+        """Creates the table with ingredients that have no info yet, if it doesn't exist already"""
+
+        table_sql = '''
+            CREATE TABLE IF NOT EXISTS pending_ingredients (
+            name TEXT PRIMARY KEY COLLATE NOCASE
+            )
+        '''
+        self.cursor.execute(table_sql)
+        self.commit()
+
+    def create_table_data_version(self) -> None:
+        """Creates the table with the data version, if it doesn't exist already.
+        It has one row with a counter that is increased whenever the recipes or the ingredient
+        info change, so cached results can check if they are still current. The user info is
+        part of the key of cached results, so it doesn't change the data version"""
+        table_sql = '''
+            CREATE TABLE IF NOT EXISTS data_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+        '''
+        self.cursor.execute(table_sql)
+        self.cursor.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+        self.commit()
+
+    def bump_data_version(self) -> None:
+        """Increases the data version, the change is committed with the change it belongs to"""
+        self.cursor.execute('UPDATE data_version SET version = version + 1')
+
+    def retrieve_data_version(self) -> int:
+        """Returns the current data version"""
+        return self.conn.execute('SELECT version FROM data_version').fetchone()[0]
 
     # testing
-    def add_recipe(self, recipe: Recipe) -> None:
-        """Adds a new recipe to the database"""
-        recipe_tup = (
-            recipe.name,
-            recipe.calories,
-            recipe.prep_time
-        )
-        ingredients = recipe.ingredients
+    def add_recipe(self, recipe: Recipe) -> int:
+        """Adds a new recipe to the database and returns its id"""
+        return self.add_recipes([recipe])[0]
 
+    def add_recipes(self, recipes: Iterable[Recipe], batch_size: int = 500) -> list[int]:
+        """Adds the recipes from any iterable to the database in one transaction and returns
+        their new ids. The recipes are streamed and written in batches with executemany"""
         recipe_insert_cmd = '''
 		    INSERT INTO recipes (
+				id,
 				name,
 		        calories,
 		        prep_time
 			)
-		    VALUES (?, ?, ?)
+		    VALUES (?, ?, ?, ?)
+		'''
+        ingredient_insert_cmd = '''
+		    INSERT INTO ingredients (
+				recipe_id,
+				name,
+		        quantity,
+		        unit,
+		        ingredient_id
+			)
+		    VALUES (?, ?, ?, ?, ?)
 		'''
 
-        self.cursor.execute(recipe_insert_cmd, recipe_tup)
-        recipe_id = self.cursor.lastrowid
+        recipe_ids: list[int] = []
+        recipe_rows: list[tuple] = []
+        ingredient_rows: list[tuple] = []
 
-        for ingredient in ingredients:
-            ingredient_tup = (
-                recipe_id,
-                ingredient.name,
-                ingredient.quantity,
-                ingredient.unit
-            )
+        with self.transaction():
+            for recipe in recipes:
+                recipe_tup = (recipe.name, recipe.calories, recipe.prep_time)
+                if not recipe_ids:
+                    # The first recipe gets its id from AUTOINCREMENT. Inserting it locks the
+                    # database for other writers, so the next ids are free to use
+                    self.cursor.execute(
+                        'INSERT INTO recipes (name, calories, prep_time) VALUES (?, ?, ?) '
+                        'RETURNING id',
+                        recipe_tup
+                    )
+                    recipe_id = self.cursor.fetchall()[0][0]
+                else:
+                    recipe_id = recipe_ids[-1] + 1
+                    recipe_rows.append((recipe_id, *recipe_tup))
+                recipe_ids.append(recipe_id)
 
-            ingredient_insert_cmd = '''
-		    	INSERT INTO ingredients (
-					recipe_id,
-					name,
-		        	quantity,
-		        	unit
-				)
-		    	VALUES (?, ?, ?, ?)
-			'''
+                ingredient_ids = self.ingredient_ids(
+                    ingredient.name for ingredient in recipe.ingredients
+                )
+                for ingredient, ingredient_id in zip(recipe.ingredients, ingredient_ids):
+                    ingredient_rows.append((
+                        recipe_id,
+                        ingredient.name,
+                        ingredient.quantity,
+                        ingredient.unit,
+                        ingredient_id
+                    ))
+
+                if len(recipe_rows) >= batch_size or len(ingredient_rows) >= batch_size:
+                    self.cursor.executemany(recipe_insert_cmd, recipe_rows)
+                    self.cursor.executemany(ingredient_insert_cmd, ingredient_rows)
+                    recipe_rows.clear()
+                    ingredient_rows.clear()
 
-            self.cursor.execute(ingredient_insert_cmd, ingredient_tup)
+            self.cursor.executemany(recipe_insert_cmd, recipe_rows)
+            self.cursor.executemany(ingredient_insert_cmd, ingredient_rows)
+
+            # The new recipes have consecutive ids, so one statement computes all their flags
+            if recipe_ids:
+                self.refresh_dietary_flags('id BETWEEN ? AND ?', (recipe_ids[0], recipe_ids[-1]))
+                self.queue_unknown_ingredients(
+                    'ingredients.recipe_id BETWEEN ? AND ?', (recipe_ids[0], recipe_ids[-1])
+                )
+                self.bump_data_version()
 
-        self.conn.commit()
+        return recipe_ids
 
     def add_ingredient_to_shopping_list(self, new_ingredient: Ingredient) -> None:
         """Adds an ingredient to the shopping list.
         The quantity of the same ingredients with the same unit gets accumulated"""
-        self.cursor.execute('SELECT * FROM shopping_list WHERE name = ?', (new_ingredient.name,))
-        existing_ingredients = self.cursor.fetchall()
-        is_added = False
-
-        # Check if such ingredient is already added and  if units match
-        if existing_ingredients is not None:
-            for existing_ingredient in existing_ingredients:
-                if new_ingredient.unit == existing_ingredient[3]:
-                    updated_quantity = new_ingredient.quantity + existing_ingredient[2]
-
-                    ingredient_tup = (
-                        new_ingredient.name,
-                        updated_quantity,
-                        new_ingredient.unit,
-                        existing_ingredient[0]
-                    )
+        self.add_ingredients_to_shopping_list([new_ingredient])
 
-                    update_cmd = '''
-                        UPDATE shopping_list
-                        SET
-                            name = ?,
-                            quantity = ?,
-                            unit = ?
-                        WHERE id = (?)
-                    '''
-                    self.cursor.execute(update_cmd, ingredient_tup)
-                    is_added = True
-
-        if not is_added:
-            new_ingredient_tup = (
-                new_ingredient.name,
-                new_ingredient.quantity,
-                new_ingredient.unit
+    def add_ingredients_to_shopping_list(self, new_ingredients: Iterable[Ingredient]) -> None:
+        """Adds all the ingredients to the shopping list in one statement batch.
+        The quantity of the same ingredients with the same unit gets accumulated"""
+        upsert_cmd = '''
+            INSERT INTO shopping_list (
+                name,
+                quantity,
+                unit,
+                ingredient_id
             )
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (ingredient_id, unit) DO UPDATE
+            SET quantity = quantity + excluded.quantity
+        '''
 
-            insert_cmd = '''
-				INSERT INTO shopping_list (
-					name,
-					quantity,
-					unit
-				)
-				VALUES (?, ?, ?)
-			'''
-
-            self.cursor.execute(insert_cmd, new_ingredient_tup)
-
-        self.conn.commit()
+        # Ingredients without a unit are stored with an empty unit, since NULLs never conflict
+        new_ingredients = list(new_ingredients)
+        ingredient_ids = self.ingredient_ids(ingredient.name for ingredient in new_ingredients)
+        ingredient_rows = (
+            (ingredient.name, ingredient.quantity, ingredient.unit or '', ingredient_id)
+            for ingredient, ingredient_id in zip(new_ingredients, ingredient_ids)
+        )
+        self.cursor.executemany(upsert_cmd, ingredient_rows)
+        self.commit()
 
     def add_user_info(self, user: User) -> None:
-        """Add user info to he database"""
-        self.cursor.execute('DELETE FROM allergies')
+        """Add user info to he database. Only the allergies that changed are written"""
+        self.cursor.execute('SELECT allergy FROM allergies')
+        current_allergies = {row[0] for row in self.cursor.fetchall()}
+        self.cursor.executemany('DELETE FROM allergies WHERE allergy = ?',
+                                [(allergy,) for allergy in current_allergies - set(user.allergies)])
         self.cursor.execute('DELETE FROM dietary_restrictions')
 
         dietary_restrictions_tup = (
@@ -207,7 +644,7 @@ class Database:
             user.is_lactose_intolerant
         )
 
-        for allergy in user.allergies:
+        for allergy in set(user.allergies) - current_allergies:
             self.cursor.execute('''INSERT INTO allergies (allergy) VALUES (?)''', (allergy,))
 
         insert_cmd = '''
@@ -220,7 +657,7 @@ class Database:
 			'''
 
         self.cursor.execute(insert_cmd, dietary_restrictions_tup)
-        self.conn.commit()
+        self.commit()
 
     def add_planned_meal(self, date: str, name_of_recipe: str) -> None:
         """Adds a chosen meal and selected date to the database"""
@@ -232,52 +669,185 @@ class Database:
         '''
 
         self.cursor.execute(insert_pm, (date, name_of_recipe))
-        self.conn.commit()
+        self.commit()
 
     def delete_ingredient_from_shopping_list(self, ingredient: Ingredient) -> None:
         """Deletes the specified ingredient from the shopping list"""
-        self.cursor.execute("DELETE FROM shopping_list WHERE name = ?", (ingredient.name,))
-        self.conn.commit()
+        self.cursor.execute(
+            'DELETE FROM shopping_list WHERE ingredient_id = ?',
+            (self.ingredient_ids([ingredient.name])[0],)
+        )
+        self.commit()
 
     # testing
-    def retrieve_recipes(self) -> list[Recipe]:
-        """Returns a list of all the recipes that are stored in the database"""
-        self.cursor.execute('SELECT * FROM recipes')
-        recipes = self.cursor.fetchall()
-        recipes_list = []
-
-        # Iterate through all the rows in recipe table and create recipe objects
-        for recipe in recipes:
-            recipe_id = recipe[0]
-            ingredient_select_cmd = 'SELECT * FROM ingredients WHERE recipe_id = ?'
-            self.cursor.execute(ingredient_select_cmd, (recipe_id,))
-            ingredients = self.cursor.fetchall()
-            ingredients_list = []
-
-            for ingredient in ingredients:
-                info = self.get_ingredient_info(ingredient[2])
-                ingredient_obj = Ingredient(
-                    ingredient[2],
-                    quantity=ingredient[3],
-                    unit=ingredient[4],
-                    is_vegan=info['is_vegan'],
-                    is_vegetarian=info['is_vegetarian'],
-                    is_lactose_free=info['is_lactose_free']
-                )
+    def select_recipe_rows(self, dietary_flags: int = 0, condition: str = 'TRUE',
+                           parameters: dict | None = None) -> sqlite3.Cursor:
+        """Streams one row per ingredient of each recipe, joined with the ingredient's dietary info.
+        Recipes without ingredients only have a row with NULL ingredient columns.
+        Only the recipes that match the SQL condition on the recipes table are selected"""
+        select_cmd = f'''
+            SELECT
+                recipes.id,
+                recipes.name,
+                recipes.calories,
+                recipes.prep_time,
+                ingredients.name,
+                ingredients.quantity,
+                ingredients.unit,
+                info.FoodItem,
+                info.Vegan,
+                info.Vegetarian,
+                info.LactoseFree,
+                recipes.dietary_flags
+            FROM recipes
+            LEFT JOIN ingredients
+                ON ingredients.recipe_id = recipes.id
+            LEFT JOIN calories_and_categories AS info
+                ON info.FoodItem = ingredients.name COLLATE NOCASE
+            WHERE (recipes.dietary_flags & :flags = :flags OR :flags = 0) AND ({condition})
+            ORDER BY recipes.id, ingredients.id
+        '''
+        return self.conn.execute(select_cmd, {**(parameters or {}), 'flags': dietary_flags})
 
-                ingredients_list.append(ingredient_obj)
+    def ingredient_info_of_row(self, row: tuple) -> dict[str, bool]:
+        """Returns the dietary info of the ingredient in a row from select_recipe_rows"""
+        if row[7] is not None:
+            return {
+                'is_vegan': row[8],
+                'is_vegetarian': row[9],
+                'is_lactose_free': row[10]
+            }
+        return self.get_ingredient_info(row[4])
 
-            recipe_obj = Recipe(
-                recipe[1],
-                calories=recipe[2],
-                prep_time=recipe[3],
-                ingredients=ingredients_list
-            )
+    def retrieve_recipes(self, dietary_flags: int = 0) -> list[Recipe]:
+        """Returns a list of all the recipes that are stored in the database. If dietary flags
+        are given, only the recipes that have all of these flags are returned"""
+        return self.recipes_of_rows(self.select_recipe_rows(dietary_flags))
+
+    def query_recipes(self, *, diet: int = 0,
+                      exclude_allergens: Iterable[str] = (),
+                      calories: tuple[int, int] | None = None,
+                      max_prep: int | None = None,
+                      must_have: Iterable[str] = (),
+                      must_not_have: Iterable[str] = (),
+                      lacks_diet: int = 0,
+                      limit: int | None = None) -> list[Recipe]:
+        """Returns the recipes that have all dietary flags in diet, contain all must have
+        ingredients and none of the allergens or must not have ingredients, and whose calories
+        are in the range and preparation time is at most max_prep. If lacks_diet is given,
+        only the recipes that miss at least one of its dietary flags are returned.
+        Ingredient names are compared casefolded and missing calories or preparation times pass,
+        like in Suggestions. The filters are done by SQLite with its indexes,
+        so only these recipes are loaded"""
+        conditions = []
+        parameters: dict = {}
+
+        if lacks_diet:
+            conditions.append('recipes.dietary_flags & :lacks_diet != :lacks_diet')
+            parameters['lacks_diet'] = lacks_diet
+        if calories is not None:
+            conditions.append('(recipes.calories IS NULL '
+                              'OR recipes.calories BETWEEN :calories_min AND :calories_max)')
+            parameters['calories_min'], parameters['calories_max'] = calories
+        if max_prep is not None:
+            conditions.append('(recipes.prep_time IS NULL OR recipes.prep_time <= :max_prep)')
+            parameters['max_prep'] = max_prep
+        for number, name in enumerate(set(must_have)):
+            conditions.append(self.contains_condition([name], f'must_have{number}_', parameters))
+        excluded = list(itertools.chain(exclude_allergens, must_not_have))
+        if excluded:
+            conditions.append(self.contains_condition(excluded, 'excluded', parameters,
+                                                      contains=False))
+
+        condition = ' AND '.join(conditions) or 'TRUE'
+        if limit is not None:
+            # Limit the recipes, not the rows, which are one per ingredient
+            parameters['limit'] = limit
+            condition = (f'recipes.id IN (SELECT recipes.id FROM recipes WHERE {condition} '
+                         f'AND (recipes.dietary_flags & :flags = :flags OR :flags = 0) '
+                         f'ORDER BY recipes.id LIMIT :limit)')
+        return self.recipes_of_rows(self.select_recipe_rows(diet, condition, parameters))
+
+    @staticmethod
+    def contains_condition(names: Iterable[str], prefix: str, parameters: dict,
+                           contains: bool = True) -> str:
+        """Returns the condition that a recipe contains (or doesn't contain) any of the
+        ingredient names, the casefolded names are added to the parameters with the prefix"""
+        placeholders = []
+        for number, name in enumerate(names):
+            parameters[f'{prefix}{number}'] = name.casefold()
+            placeholders.append(f':{prefix}{number}')
+        return f'''recipes.id {'IN' if contains else 'NOT IN'} (
+            SELECT ingredients.recipe_id
+            FROM ingredient_dictionary
+            JOIN ingredients ON ingredients.ingredient_id = ingredient_dictionary.id
+            WHERE ingredient_dictionary.name IN ({', '.join(placeholders)})
+        )'''
+
+    def recipes_of_rows(self, rows: Iterable[tuple]) -> list[Recipe]:
+        """Returns the recipe objects of the rows from select_recipe_rows"""
+        recipes_list: list[Recipe] = []
+        current_id = None
+
+        # Stream the rows and start a new recipe object whenever the recipe id changes
+        for row in rows:
+            if row[0] != current_id:
+                current_id = row[0]
+                recipes_list.append(Recipe(
+                    row[1],
+                    recipe_id=row[0],
+                    calories=row[2],
+                    prep_time=row[3],
+                    ingredients=[],
+                    dietary_flags=row[11],
+                    instruction_cache=self.instruction_cache,
+                    instruction_store=self.instruction_store
+                ))
 
-            recipes_list.append(recipe_obj)
+            if row[4] is None:
+                continue
+
+            info = self.ingredient_info_of_row(row)
+            recipes_list[-1].ingredients.append(Ingredient(
+                row[4],
+                quantity=row[5],
+                unit=row[6],
+                is_vegan=info['is_vegan'],
+                is_vegetarian=info['is_vegetarian'],
+                is_lactose_free=info['is_lactose_free']
+            ))
 
         return recipes_list
 
+    def retrieve_recipe_corpus(self, dietary_flags: int = 0) -> RecipeCorpus:
+        """Returns all recipes as a compact RecipeCorpus, without creating an object per recipe
+        or ingredient. Dietary flags filter the recipes like in retrieve_recipes"""
+        corpus = RecipeCorpus()
+        corpus.instruction_cache = self.instruction_cache
+        corpus.instruction_store = self.instruction_store
+        for _, recipe_rows in itertools.groupby(self.select_recipe_rows(dietary_flags),
+                                                key=lambda row: row[0]):
+            first_row = next(recipe_rows)
+            corpus.add(
+                first_row[0],
+                first_row[1],
+                first_row[2],
+                first_row[3],
+                first_row[11],
+                (self.corpus_ingredient_of_row(row)
+                 for row in itertools.chain([first_row], recipe_rows) if row[4] is not None)
+            )
+        return corpus
+
+    def corpus_ingredient_of_row(self, row: tuple) -> tuple:
+        """Returns the ingredient in a row from select_recipe_rows as
+        (name, quantity, unit, dietary flags) for a RecipeCorpus"""
+        info = self.ingredient_info_of_row(row)
+        flags = RecipeCorpus.flags_of(
+            info['is_vegan'], info['is_vegetarian'], info['is_lactose_free']
+        )
+        return row[4], row[5], row[6], flags
+
     def retrieve_shopping_list(self) -> list[Ingredient]:
         """Returns a list of all the ingredients that are stored in the shopping list"""
         self.cursor.execute('SELECT * FROM shopping_list')
@@ -289,7 +859,7 @@ class Database:
             ingredient_obj = Ingredient(
                 ingredient[1],
                 quantity=ingredient[2],
-                unit=ingredient[3]
+                unit=ingredient[3] or None
             )
 
             shopping_list.append(ingredient_obj)
@@ -329,34 +899,112 @@ class Database:
 
         return planned_meal
 
-    def csv_to_database(self, filename: str) -> None:
-        """Converts a csv file to a database table"""
-        df_path = os.path.join(self.project_folder, filename)
-        df = pd.read_csv(df_path)
-        df.to_sql('calories_and_categories', self.conn, index=False, if_exists='replace')
-        self.conn.commit()
+    def csv_to_database(self, filename: str, chunk_size: int = 1000) -> None:
+        """Imports a csv file with ingredient info into the calories_and_categories table.
+        The file is streamed in chunks and ingredients that are already known get updated"""
+        csv_path = os.path.join(self.project_folder, filename)
+        columns = ('FoodCategory', 'FoodItem', 'per100grams', 'Cals_per100grams',
+                   'KJ_per100grams', 'Vegan', 'Vegetarian', 'LactoseFree')
+
+        with open(csv_path, encoding='utf-8', newline='') as f, self.transaction():
+            reader = csv.DictReader(f)
+            missing_columns = set(columns) - set(reader.fieldnames or [])
+            if missing_columns:
+                raise ValueError(f'{filename} is missing the columns {sorted(missing_columns)}')
+
+            # The rows are first staged, so the file is never loaded into memory as a whole
+            self.cursor.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS csv_import AS '
+                'SELECT * FROM calories_and_categories WHERE 0'
+            )
+            self.cursor.execute('DELETE FROM temp.csv_import')
+            # Rows without an ingredient name are skipped
+            rows = filter(None, (self.normalise_csv_row(row) for row in reader))
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                self.cursor.executemany(
+                    'INSERT INTO temp.csv_import VALUES (?, ?, ?, ?, ?, ?, ?, ?)', chunk
+                )
+
+            # If the file lists an ingredient twice, the first row wins
+            self.cursor.execute('''
+                INSERT INTO calories_and_categories
+                SELECT * FROM temp.csv_import
+                WHERE rowid IN (
+                    SELECT MIN(rowid) FROM temp.csv_import GROUP BY FoodItem COLLATE NOCASE
+                )
+                ON CONFLICT (FoodItem COLLATE NOCASE) DO UPDATE
+                SET
+                    FoodCategory = excluded.FoodCategory,
+                    per100grams = excluded.per100grams,
+                    Cals_per100grams = excluded.Cals_per100grams,
+                    KJ_per100grams = excluded.KJ_per100grams,
+                    Vegan = excluded.Vegan,
+                    Vegetarian = excluded.Vegetarian,
+                    LactoseFree = excluded.LactoseFree
+            ''')
+            self.cursor.execute('DELETE FROM temp.csv_import')
+            self.bump_data_version()
+            self.refresh_dietary_flags()
+
+        self.ingredient_info_cache.invalidate()
+
+    @staticmethod
+    def normalise_csv_row(row: dict[str, str | None]) -> tuple | None:
+        """Converts a row of the ingredients csv file to the column types of the table,
+        e.g. '70 cal' becomes 70 and 'TRUE' becomes True. Returns None if the row has no
+        ingredient name, fields missing from a short row are None"""
+        food_item = (row['FoodItem'] or '').strip()
+        if not food_item:
+            return None
+
+        def leading_number(text: str | None) -> int | None:
+            match = re.match(r'\s*(\d+)', text or '')
+            return int(match.group(1)) if match else None
+
+        def flag(text: str | None) -> bool:
+            return (text or '').strip().upper() in ('TRUE', '1', 'YES')
+
+        return (
+            row['FoodCategory'],
+            food_item,
+            row['per100grams'],
+            leading_number(row['Cals_per100grams']),
+            leading_number(row['KJ_per100grams']),
+            flag(row['Vegan']),
+            flag(row['Vegetarian']),
+            flag(row['LactoseFree'])
+        )
 
     def get_ingredient_info(self, ingredient: str) -> dict[str, bool]:
         """Returns a dictionary with information about the ingredient"""
+        cached_info = self.ingredient_info_cache.get(ingredient)
+        if cached_info is not None:
+            return cached_info
+
+        # Fetch all rows so no statement stays open on the shared connection
         self.cursor.execute(
-            'SELECT * FROM calories_and_categories WHERE FoodItem = ? COLLATE NOCASE', (ingredient,)
+            'SELECT * FROM calories_and_categories WHERE FoodItem = ? COLLATE NOCASE LIMIT 1',
+            (ingredient,)
             )
-        data = self.cursor.fetchone()
+        rows = self.cursor.fetchall()
+        data = rows[0] if rows else None
         info = {}
         if data:
-            info['is_vegan'] = data[5]
-            info['is_vegetarian'] = data[6]
-            info['is_lactose_free'] = data[7]
+            # SQLite stores the flags as integers
+            info['is_vegan'] = bool(data[5])
+            info['is_vegetarian'] = bool(data[6])
+            info['is_lactose_free'] = bool(data[7])
         else:
-            print(f'{ingredient} has no info. Please update (True/False)')
-            info['is_vegan'] = bool(int(input('Is it vegan? ')))
-            info['is_vegetarian'] = bool(int(input('Is it vegetarian? ')))
-            info['is_lactose_free'] = bool(int(input('Is it lactose free? ')))
-            self.add_new_ingredient_info(ingredient, info)
+            # Unknown ingredients were queued for the user when their recipe was added. Until
+            # they are resolved they are treated as not vegan, not vegetarian and not lactose free
+            info['is_vegan'] = False
+            info['is_vegetarian'] = False
+            info['is_lactose_free'] = False
+        self.ingredient_info_cache.put(ingredient, info)
         return info
 
     def add_new_ingredient_info(self, ingredient_name, ingredient_info: dict[str, bool]) -> None:
-        """Adds a new ingredient to the database"""
+        """Adds a new ingredient to the database, or updates the info of a known ingredient"""
         ingredient_info_tup = (
             ingredient_name,
             ingredient_info['is_vegan'],
@@ -372,7 +1020,59 @@ class Database:
 					LactoseFree
 				)
 				VALUES (?, ?, ?, ?)
+				ON CONFLICT (FoodItem COLLATE NOCASE) DO UPDATE
+				SET
+					Vegan = excluded.Vegan,
+					Vegetarian = excluded.Vegetarian,
+					LactoseFree = excluded.LactoseFree
 		'''
 
         self.cursor.execute(insert_cmd, ingredient_info_tup)
-        self.conn.commit()
+        self.cursor.execute(
+            'DELETE FROM pending_ingredients WHERE name = ? COLLATE NOCASE', (ingredient_name,)
+        )
+        self.bump_data_version()
+        # The recipes are found through the indexed ingredient ids
+        self.refresh_dietary_flags(
+            '''id IN (
+                SELECT ingredients.recipe_id
+                FROM ingredient_dictionary
+                JOIN ingredients ON ingredients.ingredient_id = ingredient_dictionary.id
+                WHERE ingredient_dictionary.name = ?
+            )''',
+            (ingredient_name.casefold(),)
+        )
+        self.commit()
+        self.ingredient_info_cache.invalidate(ingredient_name)
+
+    def retrieve_trigram_index(self) -> TrigramIndex:
+        """Returns the trigram index of the ingredient names of the recipes and of the
+        ingredient info. The index is built once per data version and shared by the connection,
+        the names of the recipes come first so free text resolves to how the recipes write it"""
+        data_version = self.retrieve_data_version()
+        cached = self.shared_state.get('trigram_index')
+        if cached is not None and cached[0] == data_version:
+            return cached[1]
+
+        self.cursor.execute('''
+            SELECT name FROM (SELECT DISTINCT name FROM ingredients ORDER BY name)
+            UNION ALL
+            SELECT FoodItem FROM (SELECT FoodItem FROM calories_and_categories ORDER BY FoodItem)
+        ''')
+        index = TrigramIndex(row[0] for row in self.cursor.fetchall())
+        self.shared_state['trigram_index'] = (data_version, index)
+        return index
+
+    def retrieve_pending_ingredients(self) -> list[str]:
+        """Returns the names of the ingredients that still need their info filled in"""
+        self.cursor.execute('SELECT name FROM pending_ingredients ORDER BY name')
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def resolve_pending_ingredients(self, ingredient_infos: dict[str, dict[str, bool]]) -> None:
+        """Adds the info of several pending ingredients at once and removes them from the queue"""
+        with self.transaction():
+            for ingredient_name, ingredient_info in ingredient_infos.items():
+                self.add_new_ingredient_info(ingredient_name, ingredient_info)
+        # Another thread may have cached the old info before the commit
+        for ingredient_name in ingredient_infos:
+            self.ingredient_info_cache.invalidate(ingredient_name)
@@ -0,0 +1,126 @@
+# pylint: disable=too-many-arguments
+"""This module contains the FilterEngine class, which filters recipes with NumPy array operations"""
+
+# Imports for this file
+from collections.abc import Iterable, Sequence
+from itertools import chain
+import numpy as np
+
+# Imports from this project
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+from project.back_end.recipe import Recipe
+from project.back_end.recipe_corpus import RecipeCorpus, MISSING
+
+
+class FilterEngine:
+    """This class keeps the values that recipes are filtered on as NumPy arrays, one entry per
+    recipe, so every condition is a boolean mask and a filter is a few array operations.
+    The ingredients are stored like in a RecipeCorpus: the ids (in the ingredient dictionary)
+    of the ingredients of all recipes in one array, with the position of the recipe of
+    every ingredient next to it. Missing calories or preparation times are NaN,
+    which never fails a condition, like in the pure Python filters"""
+    def __init__(self, recipes: Sequence[Recipe]) -> None:
+        """Builds the arrays for the recipes, positions are indexes in this sequence"""
+        self.recipe_count: int = len(recipes)
+        ingredient_counts: np.ndarray
+        if isinstance(recipes, RecipeCorpus):
+            # Copy the arrays of the corpus, without creating recipe objects
+            self.calories: np.ndarray = self.corpus_column(recipes.calories)
+            self.prep_times: np.ndarray = self.corpus_column(recipes.prep_times)
+            self.dietary_flags: np.ndarray = np.array(recipes.dietary_flags, dtype=np.uint8)
+            ids_of_codes = np.array(ingredient_dictionary.ids_of(recipes.ingredient_names),
+                                    dtype=np.int64)
+            self.ingredient_ids: np.ndarray = ids_of_codes[
+                np.array(recipes.ingredient_codes, dtype=np.int64)
+            ]
+            ingredient_counts = np.diff(np.array(recipes.ingredient_offsets, dtype=np.int64))
+        else:
+            self.calories = self.column(recipe.calories for recipe in recipes)
+            self.prep_times = self.column(recipe.prep_time for recipe in recipes)
+            self.dietary_flags = np.fromiter((recipe.dietary_flags for recipe in recipes),
+                                             dtype=np.uint8, count=self.recipe_count)
+            ingredient_counts = np.fromiter((len(recipe.ingredient_id_set) for recipe in recipes),
+                                            dtype=np.int64, count=self.recipe_count)
+            self.ingredient_ids = np.fromiter(
+                chain.from_iterable(recipe.ingredient_id_set for recipe in recipes),
+                dtype=np.int64, count=int(ingredient_counts.sum())
+            )
+
+        # The position of the recipe that every entry of ingredient_ids belongs to
+        self.ingredient_recipes: np.ndarray = np.repeat(
+            np.arange(self.recipe_count, dtype=np.int64), ingredient_counts
+        )
+
+    @staticmethod
+    def column(values: Iterable[int | None]) -> np.ndarray:
+        """Returns the values as a float array, with NaN for the missing values"""
+        return np.array([np.nan if value is None else value for value in values],
+                        dtype=np.float64)
+
+    @staticmethod
+    def corpus_column(values: Iterable[int]) -> np.ndarray:
+        """Returns a column of a RecipeCorpus as a float array, with NaN for the missing values"""
+        column = np.array(values, dtype=np.float64)
+        column[column == MISSING] = np.nan
+        return column
+
+    def diet_mask(self, required_flags: int) -> np.ndarray:
+        """Returns the mask of the recipes that have all required dietary flags"""
+        return (self.dietary_flags & required_flags) == required_flags
+
+    def contains_any_mask(self, ingredient_ids: Iterable[int]) -> np.ndarray:
+        """Returns the mask of the recipes that contain at least one of the ingredients"""
+        mask = np.zeros(self.recipe_count, dtype=bool)
+        ingredient_ids = list(ingredient_ids)
+        if ingredient_ids:
+            mask[self.ingredient_recipes[np.isin(self.ingredient_ids, ingredient_ids)]] = True
+        return mask
+
+    def contains_all_mask(self, ingredient_ids: Iterable[int]) -> np.ndarray:
+        """Returns the mask of the recipes that contain all of the ingredients"""
+        mask = np.ones(self.recipe_count, dtype=bool)
+        for ingredient_id in set(ingredient_ids):
+            mask &= self.contains_any_mask([ingredient_id])
+        return mask
+
+    def calorie_mask(self, calorie_min_max: tuple[int, int]) -> np.ndarray:
+        """Returns the mask of the recipes that are not outside the calorie range"""
+        return ~((self.calories < calorie_min_max[0]) | (self.calories > calorie_min_max[1]))
+
+    def time_mask(self, max_time: int) -> np.ndarray:
+        """Returns the mask of the recipes that do not take longer than the maximum time"""
+        return ~(self.prep_times > max_time)
+
+    def mask(self, *, required_flags: int = 0,
+             allergen_ids: Iterable[int] = (),
+             must_have_ids: Iterable[int] = (),
+             should_not_have_ids: Iterable[int] = (),
+             calorie_min_max: tuple[int, int] | None = None,
+             max_time: int | None = None) -> np.ndarray:
+        """Returns the combined mask of all given conditions"""
+        mask = self.diet_mask(required_flags)
+        mask &= ~self.contains_any_mask(chain(allergen_ids, should_not_have_ids))
+        mask &= self.contains_all_mask(must_have_ids)
+        if calorie_min_max is not None:
+            mask &= self.calorie_mask(calorie_min_max)
+        if max_time is not None:
+            mask &= self.time_mask(max_time)
+        return mask
+
+    def matching_positions(self, *, within: Sequence[int] | None = None,
+                           required_flags: int = 0,
+                           allergen_ids: Iterable[int] = (),
+                           must_have_ids: Iterable[int] = (),
+                           should_not_have_ids: Iterable[int] = (),
+                           calorie_min_max: tuple[int, int] | None = None,
+                           max_time: int | None = None) -> list[int]:
+        """Returns the sorted positions of the recipes that meet all given conditions,
+        optionally only among the given positions"""
+        mask = self.mask(required_flags=required_flags, allergen_ids=allergen_ids,
+                         must_have_ids=must_have_ids, should_not_have_ids=should_not_have_ids,
+                         calorie_min_max=calorie_min_max, max_time=max_time)
+        if within is not None:
+            within_mask = np.zeros(self.recipe_count, dtype=bool)
+            within_mask[np.array(within, dtype=np.int64)] = True
+            mask &= within_mask
+        return np.flatnonzero(mask).tolist()
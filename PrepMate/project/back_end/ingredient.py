@@ -4,6 +4,9 @@
 
 class Ingredient:
     """This class will be used to create ingredient objects"""
+    # Slots instead of a __dict__ per object, as a recipe corpus holds many ingredients
+    __slots__ = ('name', 'quantity', 'unit', 'is_vegan', 'is_vegetarian', 'is_lactose_free')
+
     def __init__(self, name: str, **kwargs) -> None:
         self.name: str = name
         self.quantity: int | None = kwargs.get("quantity", 0)
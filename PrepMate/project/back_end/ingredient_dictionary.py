@@ -0,0 +1,52 @@
+"""This module contains the IngredientDictionary class and the dictionary shared by the process"""
+
+# Imports for this file
+import threading
+from collections.abc import Iterable
+
+
+class IngredientDictionary:
+    """This class interns ingredient names: every casefolded name gets a small integer id,
+    so ingredients can be compared as integers instead of lowercasing strings each time.
+    The ids are only valid within this process, the database has its own
+    ingredient_dictionary table with persistent ids"""
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def id_of(self, name: str) -> int:
+        """Returns the id of the ingredient name, adding the name if it is new"""
+        key = name.casefold()
+        ingredient_id = self._ids.get(key)
+        if ingredient_id is None:
+            with self._lock:
+                ingredient_id = self._ids.get(key)
+                if ingredient_id is None:
+                    ingredient_id = self._ids[key] = len(self.names)
+                    self.names.append(key)
+        return ingredient_id
+
+    def ids_of(self, names: Iterable[str]) -> list[int]:
+        """Returns the ids of all ingredient names, in the same order"""
+        return [self.id_of(name) for name in names]
+
+    def find_id(self, name: str) -> int:
+        """Returns the id of the ingredient name, or -1 if it is new. Unlike id_of this never
+        adds the name, so looking up typed names doesn't grow the dictionary"""
+        return self._ids.get(name.casefold(), -1)
+
+    def find_ids(self, names: Iterable[str]) -> list[int]:
+        """Returns the ids of all ingredient names in the same order, -1 for the new ones"""
+        return [self.find_id(name) for name in names]
+
+    def name_of(self, ingredient_id: int) -> str:
+        """Returns the casefolded name that belongs to the id"""
+        return self.names[ingredient_id]
+
+
+# All recipes in the process use this dictionary, so their ids can be compared
+ingredient_dictionary = IngredientDictionary()
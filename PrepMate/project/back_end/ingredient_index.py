@@ -0,0 +1,64 @@
+"""This module contains the IngredientIndex class, an inverted index from ingredients to recipes"""
+
+# Imports for this file
+from collections.abc import Iterable, Sequence, Set
+from functools import reduce
+
+# Imports from this project
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+from project.back_end.recipe import Recipe
+from project.back_end.recipe_corpus import RecipeCorpus
+
+
+class IngredientIndex:
+    """This class maps the id of every ingredient (in the ingredient dictionary) to the set
+    of positions of the recipes that contain it, so ingredient queries only touch the recipes
+    that contain the ingredients instead of every recipe"""
+    def __init__(self, recipes: Sequence[Recipe]) -> None:
+        """Builds the index for the recipes, positions are indexes in this sequence"""
+        self.recipe_count: int = len(recipes)
+        postings: dict[int, list[int]] = {}
+        if isinstance(recipes, RecipeCorpus):
+            # Read the ingredients from the arrays, without creating recipe objects
+            ids_of_codes = ingredient_dictionary.ids_of(recipes.ingredient_names)
+            offsets = recipes.ingredient_offsets
+            for position in range(len(recipes)):
+                for code in recipes.ingredient_codes[offsets[position]:offsets[position + 1]]:
+                    postings.setdefault(ids_of_codes[code], []).append(position)
+        else:
+            for position, recipe in enumerate(recipes):
+                for ingredient_id in recipe.ingredient_id_set:
+                    postings.setdefault(ingredient_id, []).append(position)
+
+        self.postings: dict[int, frozenset[int]] = {
+            ingredient_id: frozenset(positions) for ingredient_id, positions in postings.items()
+        }
+
+    def recipes_with(self, ingredient_id: int) -> frozenset[int]:
+        """Returns the positions of the recipes that contain the ingredient"""
+        return self.postings.get(ingredient_id, frozenset())
+
+    def matching_positions(self, must_have_ids: Iterable[int],
+                           should_not_have_ids: Iterable[int] = (),
+                           within: Set[int] | None = None) -> list[int]:
+        """Returns the sorted positions of the recipes that contain all must haves and none of
+        the should not haves, optionally only among the given positions. With must haves
+        the work depends on the number of recipes that contain them, not on all recipes"""
+        must_have_postings = sorted((self.recipes_with(ingredient_id)
+                                     for ingredient_id in set(must_have_ids)), key=len)
+        candidates: Iterable[int]
+        if must_have_postings:
+            # Intersect starting with the smallest set, so every step is at most that large
+            matching: frozenset[int] = reduce(frozenset.intersection, must_have_postings)
+            candidates = matching if within is None else matching & within
+        elif within is not None:
+            candidates = within
+        else:
+            candidates = range(self.recipe_count)
+
+        should_not_have_postings = [self.recipes_with(ingredient_id)
+                                    for ingredient_id in set(should_not_have_ids)]
+        return sorted(
+            position for position in candidates
+            if not any(position in posting for posting in should_not_have_postings)
+        )
@@ -0,0 +1,23 @@
+"""This module contains the IngredientInfoCache class"""
+
+# Imports for this file
+from typing import Any
+
+# Imports from this project
+from project.back_end.lru_cache import LRUCache
+
+
+class IngredientInfoCache(LRUCache[str, dict[str, bool]]):
+    """This class is a size-bounded LRU cache for the dietary info of ingredients,
+    keyed by the casefolded ingredient name"""
+    def __init__(self, maxsize: int = 1024) -> None:
+        super().__init__(maxsize)
+
+    def normalise_key(self, key: str) -> str:
+        return key.casefold()
+
+    def freeze(self, value: dict[str, bool]) -> Any:
+        return dict(value)
+
+    def thaw(self, stored: Any) -> dict[str, bool]:
+        return dict(stored)
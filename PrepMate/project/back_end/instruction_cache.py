@@ -0,0 +1,21 @@
+"""This module contains the InstructionCache class"""
+
+# Imports for this file
+from typing import Any
+
+# Imports from this project
+from project.back_end.lru_cache import LRUCache
+
+
+class InstructionCache(LRUCache[int, list[str]]):
+    """This class is a size-bounded LRU cache for the cooking instructions of recipes,
+    keyed by the recipe id like the instruction store, so instructions are only read once
+    and recipes with the same name never share them"""
+    def __init__(self, maxsize: int = 256) -> None:
+        super().__init__(maxsize)
+
+    def freeze(self, value: list[str]) -> Any:
+        return tuple(value)
+
+    def thaw(self, stored: Any) -> list[str]:
+        return list(stored)
@@ -0,0 +1,123 @@
+"""This module contains the InstructionStore class, which keeps the cooking instructions
+of all recipes in one packed file"""
+
+# Imports for this file
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import ClassVar
+
+# Every index record holds the recipe id, the offset and length of the record in the
+# data file and its flags. A later record for the same recipe replaces the earlier one.
+INDEX_RECORD = struct.Struct('<qQIB')
+FLAG_COMPRESSED = 1
+
+
+class InstructionStore:
+    """This class stores the instructions of each recipe as one record in a data file,
+    with an index file that maps the recipe id to the position of the record.
+    The index is read once and the data file is memory mapped,
+    so reading the instructions of a recipe is a single slice"""
+    _stores: ClassVar[dict[str, 'InstructionStore']] = {}
+    _stores_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        """Opens the store with files path.dat and path.idx, which are created on the first write"""
+        self.data_path: str = path + '.dat'
+        self.index_path: str = path + '.idx'
+        self._index: dict[int, tuple[int, int, int]] = {}
+        self._mmap: mmap.mmap | None = None
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @classmethod
+    def for_database(cls, db_path: str) -> 'InstructionStore':
+        """Returns the store belonging to the database file, which is shared by all threads"""
+        path = os.path.splitext(os.path.abspath(db_path))[0] + '.instructions'
+        with cls._stores_lock:
+            if path not in cls._stores:
+                cls._stores[path] = cls(path)
+            return cls._stores[path]
+
+    @classmethod
+    def close_for_database(cls, db_path: str) -> None:
+        """Closes the store belonging to the database file"""
+        path = os.path.splitext(os.path.abspath(db_path))[0] + '.instructions'
+        with cls._stores_lock:
+            store = cls._stores.pop(path, None)
+        if store is not None:
+            store.close()
+
+    def __contains__(self, recipe_id: object) -> bool:
+        return isinstance(recipe_id, int) and recipe_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _load_index(self) -> None:
+        """Reads all index records into memory"""
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, 'rb') as f:
+            index_data = f.read()
+        usable_length = len(index_data) - len(index_data) % INDEX_RECORD.size
+        for recipe_id, offset, length, flags in INDEX_RECORD.iter_unpack(
+                index_data[:usable_length]):
+            self._index[recipe_id] = (offset, length, flags)
+
+    def get(self, recipe_id: int) -> list[str] | None:
+        """Returns the instructions of the recipe, or None if the store has none"""
+        record = self._index.get(recipe_id)
+        if record is None:
+            return None
+
+        offset, length, flags = record
+        if length == 0:
+            return []
+        with self._lock:
+            # The map only covers the file as it was when it was made, so remap after writes
+            if self._mmap is None or offset + length > len(self._mmap):
+                self._remap()
+            assert self._mmap is not None
+            data = self._mmap[offset:offset + length]
+
+        if flags & FLAG_COMPRESSED:
+            data = zlib.decompress(data)
+        return data.decode('utf-8').splitlines(keepends=True)
+
+    def put(self, recipe_id: int, instructions: list[str], compress: bool = True) -> None:
+        """Appends the instructions of the recipe to the store. Each instruction is one line.
+        The record is only compressed if compression makes it smaller"""
+        data = ''.join(line if line.endswith('\n') else line + '\n'
+                       for line in instructions).encode('utf-8')
+        flags = 0
+        if compress:
+            compressed = zlib.compress(data)
+            if len(compressed) < len(data):
+                data = compressed
+                flags |= FLAG_COMPRESSED
+
+        with self._lock:
+            with open(self.data_path, 'ab') as data_file:
+                offset = data_file.tell()
+                data_file.write(data)
+            with open(self.index_path, 'ab') as index_file:
+                index_file.write(INDEX_RECORD.pack(recipe_id, offset, len(data), flags))
+            self._index[recipe_id] = (offset, len(data), flags)
+
+    def _remap(self) -> None:
+        """Maps the current data file into memory"""
+        if self._mmap is not None:
+            self._mmap.close()
+        with open(self.data_path, 'rb') as data_file:
+            self._mmap = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Closes the memory map of the data file"""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
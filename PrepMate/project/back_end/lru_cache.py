@@ -0,0 +1,68 @@
+"""This module contains the LRUCache class that the caches of this project are built on"""
+
+# Imports for this file
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Generic, TypeVar
+
+KeyT = TypeVar('KeyT', bound=Hashable)
+ValueT = TypeVar('ValueT')
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    """This class is a size-bounded LRU cache that can be used from several threads.
+    Subclasses can override normalise_key to make keys that mean the same equal, and
+    freeze and thaw to store an immutable copy of a value and hand out a fresh copy of it,
+    so callers can't change the cached value"""
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def normalise_key(self, key: KeyT) -> Hashable:
+        """Returns the key that the entry is stored under"""
+        return key
+
+    def freeze(self, value: ValueT) -> Any:
+        """Returns what is stored for the value"""
+        return value
+
+    def thaw(self, stored: Any) -> ValueT:
+        """Returns the value that is handed out for what is stored"""
+        return stored
+
+    def get(self, key: KeyT) -> ValueT | None:
+        """Returns the cached value of the key, or None if it is not cached"""
+        with self._lock:
+            stored_key = self.normalise_key(key)
+            stored = self._entries.get(stored_key)
+            if stored is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(stored_key)
+            self.hits += 1
+            return self.thaw(stored)
+
+    def put(self, key: KeyT, value: ValueT) -> None:
+        """Stores the value of the key, evicting the least recently used entry if full"""
+        with self._lock:
+            stored_key = self.normalise_key(key)
+            self._entries[stored_key] = self.freeze(value)
+            self._entries.move_to_end(stored_key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: KeyT | None = None) -> None:
+        """Removes the key from the cache, or empties the whole cache if no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.normalise_key(key), None)
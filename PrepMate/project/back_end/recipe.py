@@ -1,53 +1,126 @@
+# pylint: disable=too-many-instance-attributes
 """This module will be used to create recipe objects in the database."""
 
 # Imports from this project
 import os
+from array import array
+from collections.abc import Iterable
 from project.back_end.ingredient import Ingredient
+from project.back_end.instruction_cache import InstructionCache
+from project.back_end.instruction_store import InstructionStore
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+
+# Bits of the dietary bitmask, a bit is set if every ingredient of the recipe has the property
+VEGAN = 1
+VEGETARIAN = 2
+LACTOSE_FREE = 4
 
 
 class Recipe:
     """This class will be used to create recipe objects"""
+    __slots__ = ('name', 'recipe_id', 'ingredients', 'calories', 'prep_time', '_dietary_flags',
+                 '_ingredient_ids', '_ingredient_id_set', 'instruction_cache', 'instruction_store',
+                 '_instructions')
+
     def __init__(self, name, **kwargs) -> None:
         self.name: str = name
+        self.recipe_id: int | None = kwargs.get('recipe_id', None)
         self.ingredients: list[Ingredient] = kwargs.get('ingredients', [])
         self.calories: int | None = kwargs.get('calories', None)
         self.prep_time: int | None = kwargs.get('prep_time', None)
-        self.instructions: list[str] = self.get_instructions_from_file()
+        self._dietary_flags: int | None = kwargs.get('dietary_flags', None)
+        self._ingredient_ids: array | None = None
+        self._ingredient_id_set: frozenset[int] | None = None
+        # The instructions are only read from their file when they are first needed
+        self.instruction_cache: InstructionCache | None = kwargs.get('instruction_cache', None)
+        self.instruction_store: InstructionStore | None = kwargs.get('instruction_store', None)
+        self._instructions: list[str] | None = kwargs.get('instructions', None)
+
+    @property
+    def instructions(self) -> list[str]:
+        """This method will return the cooking instructions, loading them on first access"""
+        if self._instructions is None:
+            # The cache and the store know recipes by id, a recipe without one only has a file
+            recipe_id = self.recipe_id
+            if self.instruction_cache is not None and recipe_id is not None:
+                self._instructions = self.instruction_cache.get(recipe_id)
+            if self._instructions is None and self.instruction_store is not None \
+                    and recipe_id is not None:
+                self._instructions = self.instruction_store.get(recipe_id)
+            if self._instructions is None:
+                self._instructions = self.get_instructions_from_file()
+                if self.instruction_cache is not None and recipe_id is not None \
+                        and len(self._instructions) > 0:
+                    self.instruction_cache.put(recipe_id, self._instructions)
+
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions: list[str]) -> None:
+        self._instructions = instructions
+
+    @property
+    def dietary_flags(self) -> int:
+        """This method will return the dietary bitmask of the recipe. It is computed from the
+        ingredients on first access, unless the database already passed it in"""
+        if self._dietary_flags is None:
+            flags = VEGAN | VEGETARIAN | LACTOSE_FREE
+            for ingredient in self.ingredients:
+                if not ingredient.is_vegan:
+                    flags &= ~VEGAN
+                if not ingredient.is_vegetarian:
+                    flags &= ~VEGETARIAN
+                if not ingredient.is_lactose_free:
+                    flags &= ~LACTOSE_FREE
+            self._dietary_flags = flags
+
+        return self._dietary_flags
+
+    @property
+    def ingredient_ids(self) -> array:
+        """This method will return the ids of the ingredients in the ingredient dictionary.
+        They are looked up once, on first access"""
+        if self._ingredient_ids is None:
+            self._ingredient_ids = array('l', ingredient_dictionary.ids_of(
+                ingredient.name for ingredient in self.ingredients
+            ))
+
+        return self._ingredient_ids
+
+    @property
+    def ingredient_id_set(self) -> frozenset[int]:
+        """This method will return the ingredient ids as a set, so lookups take constant time.
+        The ids stand for the casefolded ingredient names"""
+        if self._ingredient_id_set is None:
+            self._ingredient_id_set = frozenset(self.ingredient_ids)
+
+        return self._ingredient_id_set
 
     @property
     def is_vegan(self) -> bool:
         """This method will return True if the recipe is vegan, False otherwise"""
-        for ingredient in self.ingredients:
-            if not ingredient.is_vegan:
-                return False
-
-        return True
+        return bool(self.dietary_flags & VEGAN)
 
     @property
     def is_vegetarian(self) -> bool:
         """This method will return True if the recipe is vegetarian, False otherwise"""
-        for ingredient in self.ingredients:
-            if not ingredient.is_vegetarian:
-                return False
-
-        return True
+        return bool(self.dietary_flags & VEGETARIAN)
 
     @property
     def is_lactose_free(self) -> bool:
         """This method will return True if the recipe is lactose free, False otherwise"""
-        for ingredient in self.ingredients:
-            if not ingredient.is_lactose_free:
-                return False
-
-        return True
+        return bool(self.dietary_flags & LACTOSE_FREE)
 
     def contains(self, allergen: str) -> bool:
         """This method will return True if the recipe contains the allergen, False otherwise"""
-        for ingredient in self.ingredients:
-            if ingredient.name.lower() == allergen.lower():
-                return True
+        # The ids of the ingredients are looked up first, so their names are in the dictionary
+        ingredient_id_set = self.ingredient_id_set
+        return ingredient_dictionary.find_id(allergen) in ingredient_id_set
 
-        return False
+    def contains_any(self, allergens: Iterable[str]) -> bool:
+        """This method will return True if the recipe contains any of the allergens"""
+        ingredient_id_set = self.ingredient_id_set
+        return not ingredient_id_set.isdisjoint(ingredient_dictionary.find_ids(allergens))
 
     def get_instructions_from_file(self) -> list[str]:
         """Returns a list of cooking instructions from a file"""
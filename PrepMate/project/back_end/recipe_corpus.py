@@ -0,0 +1,186 @@
+# pylint: disable=too-many-instance-attributes, too-many-arguments, too-many-positional-arguments
+"""This module contains the RecipeCorpus class, a compact columnar store of many recipes"""
+
+# Imports for this file
+import math
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+# Imports from this project
+from project.back_end.ingredient import Ingredient
+from project.back_end.instruction_cache import InstructionCache
+from project.back_end.instruction_store import InstructionStore
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN, LACTOSE_FREE
+
+# Stored in place of a missing calories or preparation time
+MISSING = -1
+
+
+class RecipeCorpus(Sequence[Recipe]):
+    """This class keeps recipes in flat arrays instead of one object per recipe and ingredient.
+    The ingredients of recipe i are at positions ingredient_offsets[i] up to
+    ingredient_offsets[i + 1] of the ingredient arrays (CSR layout), and ingredient names
+    and units are stored once and referred to by their code.
+    Recipe objects are only created when a recipe is accessed"""
+    def __init__(self) -> None:
+        # One entry per recipe
+        self.recipe_ids: array = array('q')
+        self.names: list[str] = []
+        self.calories: array = array('q')
+        self.prep_times: array = array('q')
+        self.dietary_flags: array = array('B')
+        self.ingredient_offsets: array = array('q', [0])
+
+        # One entry per ingredient of a recipe
+        self.ingredient_codes: array = array('l')
+        self.quantities: array = array('d')
+        self.unit_codes: array = array('l')
+
+        # One entry per distinct ingredient name or unit
+        self.ingredient_names: list[str] = []
+        self.ingredient_flags: array = array('B')
+        self.units: list[str | None] = []
+        self._ingredient_lookup: dict[str, int] = {}
+        self._unit_lookup: dict[str | None, int] = {}
+
+        # Passed on to the recipe objects, so their instructions can be loaded
+        self.instruction_cache: InstructionCache | None = None
+        self.instruction_store: InstructionStore | None = None
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Recipe]) -> 'RecipeCorpus':
+        """Creates a corpus from recipe objects"""
+        corpus = cls()
+        for recipe in recipes:
+            corpus.append(recipe)
+        return corpus
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, position: int) -> Recipe: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> list[Recipe]: ...
+
+    def __getitem__(self, position: int | slice) -> Recipe | list[Recipe]:
+        if isinstance(position, slice):
+            return [self.recipe_at(i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('recipe corpus index out of range')
+        return self.recipe_at(position)
+
+    def __iter__(self) -> Iterator[Recipe]:
+        for position in range(len(self)):
+            yield self.recipe_at(position)
+
+    def append(self, recipe: Recipe) -> None:
+        """Adds a recipe object to the corpus"""
+        self.add(
+            recipe.recipe_id,
+            recipe.name,
+            recipe.calories,
+            recipe.prep_time,
+            recipe.dietary_flags,
+            ((ingredient.name, ingredient.quantity, ingredient.unit,
+              self.flags_of(ingredient.is_vegan, ingredient.is_vegetarian,
+                            ingredient.is_lactose_free))
+             for ingredient in recipe.ingredients)
+        )
+
+    def add(self, recipe_id: int | None, name: str, calories: int | None, prep_time: int | None,
+            dietary_flags: int | None, ingredients: Iterable[tuple]) -> None:
+        """Adds a recipe from its raw values, the ingredients are tuples of
+        (name, quantity, unit, dietary flags). If the dietary flags of the recipe are
+        not known, they are computed from the ingredients"""
+        self.recipe_ids.append(MISSING if recipe_id is None else recipe_id)
+        self.names.append(name)
+        self.calories.append(MISSING if calories is None else calories)
+        self.prep_times.append(MISSING if prep_time is None else prep_time)
+
+        recipe_flags = VEGAN | VEGETARIAN | LACTOSE_FREE
+        for ingredient_name, quantity, unit, flags in ingredients:
+            recipe_flags &= flags
+            self.ingredient_codes.append(self.ingredient_code(ingredient_name, flags))
+            self.quantities.append(math.nan if quantity is None else quantity)
+            unit_code = self._unit_lookup.get(unit)
+            if unit_code is None:
+                unit_code = self._unit_lookup[unit] = len(self.units)
+                self.units.append(unit)
+            self.unit_codes.append(unit_code)
+        self.ingredient_offsets.append(len(self.ingredient_codes))
+        self.dietary_flags.append(recipe_flags if dietary_flags is None else dietary_flags)
+
+    def ingredient_code(self, ingredient_name: str, flags: int = 0) -> int:
+        """Returns the code of the ingredient name, adding it to the names if it is new"""
+        code = self._ingredient_lookup.get(ingredient_name)
+        if code is None:
+            code = self._ingredient_lookup[ingredient_name] = len(self.ingredient_names)
+            self.ingredient_names.append(ingredient_name)
+            self.ingredient_flags.append(flags)
+        return code
+
+    @staticmethod
+    def flags_of(is_vegan: bool | None, is_vegetarian: bool | None,
+                 is_lactose_free: bool | None) -> int:
+        """Returns the dietary bitmask of a single ingredient"""
+        return ((VEGAN if is_vegan else 0)
+                | (VEGETARIAN if is_vegetarian else 0)
+                | (LACTOSE_FREE if is_lactose_free else 0))
+
+    def recipe_at(self, position: int) -> Recipe:
+        """Creates a recipe object for the recipe at the position"""
+        ingredients = []
+        for i in range(self.ingredient_offsets[position], self.ingredient_offsets[position + 1]):
+            code = self.ingredient_codes[i]
+            flags = self.ingredient_flags[code]
+            quantity = self.quantities[i]
+            ingredients.append(Ingredient(
+                self.ingredient_names[code],
+                quantity=None if math.isnan(quantity) else
+                int(quantity) if quantity.is_integer() else quantity,
+                unit=self.units[self.unit_codes[i]],
+                is_vegan=bool(flags & VEGAN),
+                is_vegetarian=bool(flags & VEGETARIAN),
+                is_lactose_free=bool(flags & LACTOSE_FREE)
+            ))
+
+        recipe_id = self.recipe_ids[position]
+        calories = self.calories[position]
+        prep_time = self.prep_times[position]
+        return Recipe(
+            self.names[position],
+            recipe_id=None if recipe_id == MISSING else recipe_id,
+            calories=None if calories == MISSING else calories,
+            prep_time=None if prep_time == MISSING else prep_time,
+            ingredients=ingredients,
+            dietary_flags=self.dietary_flags[position],
+            instruction_cache=self.instruction_cache,
+            instruction_store=self.instruction_store
+        )
+
+    def matching_positions(self, required_flags: int = 0,
+                           excluded_ingredients: Iterable[str] = ()) -> list[int]:
+        """Returns the positions of the recipes that have all required dietary flags and
+        contain none of the excluded ingredients, which are compared case insensitively"""
+        excluded_names = {name.casefold() for name in excluded_ingredients}
+        excluded_codes = {
+            code for code, name in enumerate(self.ingredient_names)
+            if name.casefold() in excluded_names
+        }
+
+        positions = []
+        offsets = self.ingredient_offsets
+        codes = self.ingredient_codes
+        for position, flags in enumerate(self.dietary_flags):
+            if flags & required_flags != required_flags:
+                continue
+            if excluded_codes and not excluded_codes.isdisjoint(
+                    codes[offsets[position]:offsets[position + 1]]):
+                continue
+            positions.append(position)
+        return positions
@@ -1,73 +1,320 @@
+# pylint: disable=too-many-instance-attributes
 """
 This module will be used to generate random recipe suggestions. It will also be used 
 to filter the recipes based on the user preferences.
 """
 
 # Imports for this class
+import heapq
+import math
 import random as rnd
+from collections.abc import Iterable, Iterator, Sequence
 
 # Imports from this project
 from project.back_end.user import User
 from project.back_end.database import Database
-from project.back_end.recipe import Recipe
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN, LACTOSE_FREE
+from project.back_end.ingredient import Ingredient
+from project.back_end.recipe_corpus import RecipeCorpus
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+from project.back_end.ingredient_index import IngredientIndex
+from project.back_end.filter_engine import FilterEngine
+from project.back_end.candidate_cache import CandidateCache
+from project.back_end.trigram_index import TrigramIndex
 
 
 class Suggestions():
     """This class will be used to generate recipe suggestions based on the user preferences"""
-    def __init__(self, user=None, recipes=None) -> None:
-        self.user: User = user or Database('PrepMate.db').retrieve_user_info()
-        self.all_recipes: list[Recipe] = recipes or Database('PrepMate.db').retrieve_recipes()
-        self.filtered_recipes: list[Recipe] | None = self.check_user_information(self.all_recipes)
+    def __init__(self, user=None, recipes=None, seed: int | rnd.Random | None = None,
+                 database: Database | None = None) -> None:
+        # Without recipes, the database is queried for the recipes that fit the user
+        self.database: Database | None = (None if recipes is not None
+                                          else database or Database('PrepMate.db'))
+        self.user: User = user or (self.database or Database('PrepMate.db')).retrieve_user_info()
+        self.all_recipes: Sequence[Recipe] = (recipes if self.database is None
+                                          else self.query_candidates(self.database, self.user))
+        self._ingredient_index: IngredientIndex | None = None
+        self._filter_engine: FilterEngine | None = None
+        self._trigram_index: TrigramIndex | None = None
+        # The positions in all_recipes of the filtered recipes, in the same order
+        self.filtered_positions: list[int] = (self.user_positions(self.all_recipes)
+                                              if self.database is None
+                                              else list(range(len(self.all_recipes))))
+        self.filtered_recipes: list[Recipe] | None = [
+            self.all_recipes[position] for position in self.filtered_positions
+        ]
+        # Whether preferences were checked, later preferences only keep these filtered recipes
+        self.has_preferences: bool = False
         self.suggestions: list[Recipe] = []
+        # The pages of suggestions for the current filtered recipes, started when needed
+        self.suggestion_pages: Iterator[list[Recipe]] | None = None
+        # Draws the seed of every page, the same seed gives the same stream of suggestions
+        self.rng: rnd.Random = seed if isinstance(seed, rnd.Random) else rnd.Random(seed)
+        # The seeds of the pages of the current shuffle so far, to replay them
+        self.page_seeds: list[int] = []
+
+    @property
+    def ingredient_index(self) -> IngredientIndex:
+        """The inverted index from ingredients to the positions of all recipes,
+        built the first time it is needed"""
+        if self._ingredient_index is None:
+            self._ingredient_index = IngredientIndex(self.all_recipes)
+        return self._ingredient_index
+
+    @property
+    def filter_engine(self) -> FilterEngine:
+        """The NumPy arrays of all recipes that a corpus is filtered on,
+        built the first time they are needed"""
+        if self._filter_engine is None:
+            self._filter_engine = FilterEngine(self.all_recipes)
+        return self._filter_engine
+
+    @property
+    def trigram_index(self) -> TrigramIndex:
+        """The trigram index of the ingredient names that typed names are resolved to, those of
+        the database or else those of all recipes, built the first time it is needed"""
+        if self._trigram_index is None:
+            self._trigram_index = (self.database.retrieve_trigram_index()
+                                   if self.database is not None
+                                   else self.vocabulary_index(self.all_recipes))
+        return self._trigram_index
+
+    @staticmethod
+    def vocabulary_index(recipes: Sequence[Recipe]) -> TrigramIndex:
+        """
+        This method will return the trigram index of the ingredient names of the recipes
+        """
+        if isinstance(recipes, RecipeCorpus):
+            return TrigramIndex(recipes.ingredient_names)
+        return TrigramIndex(dict.fromkeys(
+            ingredient.name for recipe in recipes for ingredient in recipe.ingredients
+        ))
 
     def random_suggestions(self) -> None:
-        """This method will generate a list of random recipes"""
-        random_recipes = []
-        if self.filtered_recipes is not None:
-            if self.suggestions == [] and len(self.filtered_recipes) > 10:
-                random_recipes = rnd.sample(self.filtered_recipes, 10)
-            elif self.suggestions == [] and len(self.filtered_recipes) < 10:
-                random_recipes = rnd.sample(self.filtered_recipes, len(self.filtered_recipes))
-            else:
-                recipes = [
-                    recipe for recipe in self.filtered_recipes if recipe not in self.suggestions
-                    ]
-                if len(recipes) > 10:
-                    random_recipes = rnd.sample(recipes, 10)
-                else:
-                    random_recipes = rnd.sample(recipes, len(recipes))
-
-        self.suggestions = random_recipes
-
-    def check_user_information(self, recipes: list[Recipe]) -> list[Recipe]:
+        """This method will generate a list of random recipes. Every call gives the next page
+        of the same shuffle, so no recipe is repeated until all of them were suggested.
+        Then an empty list is given once and the next call starts a new shuffle"""
+        if self.suggestion_pages is None:
+            self.suggestion_pages = self.sample_pages()
+        self.suggestions = next(self.suggestion_pages, [])
+        if not self.suggestions:
+            self.suggestion_pages = None
+
+    def replay_suggestions(self, page_seeds: Sequence[int]) -> None:
+        """This method will start the shuffle again from the recorded seeds of its pages,
+        so this and the next calls of random_suggestions give the same pages as when the seeds
+        were recorded, as long as the filtered recipes are the same. After the recorded pages,
+        the pages are random again"""
+        self.suggestion_pages = self.sample_pages(page_seeds=page_seeds)
+        self.random_suggestions()
+
+    def sample_pages(self, page_size: int = 10,
+                     page_seeds: Sequence[int] = ()) -> Iterator[list[Recipe]]:
+        """
+        This generator will shuffle the filtered recipes lazily and yield them in pages.
+        It is a Fisher-Yates shuffle that only does the swaps for the next page, and the swapped
+        positions are kept in a dict, so every page takes time in the page size and not in
+        the number of recipes. Every page is drawn with its own generator, seeded from the
+        given page seeds or else from rng, and the seeds are recorded in page_seeds
+        """
+        recipes = self.filtered_recipes or []
+        swapped: dict[int, int] = {}
+        self.page_seeds = []
+        for page_number, start in enumerate(range(0, len(recipes), page_size)):
+            seed = (page_seeds[page_number] if page_number < len(page_seeds)
+                    else self.rng.getrandbits(32))
+            self.page_seeds.append(seed)
+            generator = rnd.Random(seed)
+            page = []
+            for i in range(start, min(start + page_size, len(recipes))):
+                j = generator.randrange(i, len(recipes))
+                # Swap positions i and j, a position that was never swapped holds itself
+                page.append(swapped.get(j, j))
+                swapped[j] = swapped.pop(i, i)
+            yield [recipes[position] for position in page]
+
+    def ranked_suggestions(self, shopping_list: Iterable[Ingredient] | None = None,
+                           k: int = 10) -> None:
+        """
+        This method will suggest the k filtered recipes that use most of the shopping list.
+        Every ingredient on the list weighs 1 + log(1 + quantity), so larger quantities count
+        more but don't outweigh everything else. A recipe scores the weights of the listed
+        ingredients it contains. Only the recipes that share an ingredient with the list are
+        scored, through the ingredient index, and a heap keeps the best k of them
+        """
+        if shopping_list is None:
+            shopping_list = (self.database or Database('PrepMate.db')).retrieve_shopping_list()
+
+        # Building the index adds the ingredients of the recipes to the dictionary
+        ingredient_index = self.ingredient_index
+        weights: dict[int, float] = {}
+        for ingredient in shopping_list:
+            ingredient_id = ingredient_dictionary.find_id(ingredient.name)
+            weights[ingredient_id] = (weights.get(ingredient_id, 0.0)
+                                      + 1 + math.log1p(max(ingredient.quantity or 0, 0)))
+
+        filtered = frozenset(self.filtered_positions)
+        scores: dict[int, float] = {}
+        for ingredient_id, weight in weights.items():
+            for position in ingredient_index.recipes_with(ingredient_id) & filtered:
+                scores[position] = scores.get(position, 0.0) + weight
+
+        # Equal scores keep the order of the recipes
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        self.suggestions = [self.all_recipes[position] for position, _ in best]
+
+    def required_dietary_flags(self) -> int:
+        """
+        This method will return the dietary flags a recipe needs to have for the user
+        """
+        return self.dietary_flags_of(self.user)
+
+    @staticmethod
+    def dietary_flags_of(user: User) -> int:
+        """
+        This method will return the dietary flags a recipe needs to have for the given user
+        """
+        if user.is_vegan:
+            return VEGAN
+        if user.is_vegetarian:
+            return VEGETARIAN
+        if user.is_lactose_intolerant:
+            return LACTOSE_FREE
+        return 0
+
+    @staticmethod
+    def candidate_query(user: User, preferences: tuple | list | None = None) -> dict:
+        """
+        This method will return the arguments of Database.query_recipes for the user and preferences
+        """
+        must_haves, should_not_haves, calorie_min_max, max_time = (
+            preferences if preferences is not None else ([], [], None, None)
+        )
+        return {
+            'diet': Suggestions.dietary_flags_of(user),
+            'exclude_allergens': list(user.allergies),
+            'calories': calorie_min_max,
+            'max_prep': max_time,
+            'must_have': list(must_haves),
+            'must_not_have': list(should_not_haves)
+        }
+
+    @staticmethod
+    def query_candidates(database: Database, user: User,
+                         preferences: tuple | list | None = None) -> list[Recipe]:
+        """
+        This method will return the (cached) recipes that fit the user and the preferences
+        """
+        user, preferences = Suggestions.resolve_names(database.retrieve_trigram_index(),
+                                                      user, preferences)
+        key = CandidateCache.key_of(user, preferences)
+        data_version = database.retrieve_data_version()
+        recipes = database.candidate_cache.get(key, data_version)
+        if recipes is not None:
+            return recipes
+
+        related = database.candidate_cache.related(key, data_version)
+        if related is not None:
+            recipes = Suggestions.refilter_candidates(database, *related, user, preferences)
+        else:
+            recipes = database.query_recipes(**Suggestions.candidate_query(user, preferences))
+        database.candidate_cache.put(key, recipes, data_version)
+        return recipes
+
+    @staticmethod
+    def resolve_names(index: TrigramIndex, user: User, preferences: tuple | list | None = None
+                      ) -> tuple[User, tuple | None]:
+        """This method will resolve the typed ingredient names to the names of the index"""
+        resolved_user = User(is_vegan=user.is_vegan, is_vegetarian=user.is_vegetarian,
+                             is_lactose_intolerant=user.is_lactose_intolerant,
+                             allergies=index.exclude_all(user.allergies))
+        if preferences is None:
+            return resolved_user, None
+        must_haves, should_not_haves, calorie_min_max, max_time = preferences
+        return resolved_user, (index.resolve_all(must_haves), index.exclude_all(should_not_haves),
+                               calorie_min_max, max_time)
+
+    @staticmethod
+    def refilter_candidates(database: Database, previous_key: tuple,
+                            previous_recipes: list[Recipe], user: User,
+                            preferences: tuple | list | None = None) -> list[Recipe]:
+        """
+        This method will change the cached recipes of the previous user to those of the new user
+        """
+        previous_flags = Suggestions.dietary_flags_of(User(
+            is_vegan=previous_key[0],
+            is_vegetarian=previous_key[1],
+            is_lactose_intolerant=previous_key[2]
+        ))
+        flags = Suggestions.dietary_flags_of(user)
+        previous_allergies = previous_key[3]
+        allergies = {allergy.casefold() for allergy in user.allergies}
+
+        # Remove the recipes with a new allergen or without a new dietary flag
+        index = IngredientIndex(previous_recipes)
+        recipes = [
+            previous_recipes[position] for position in index.matching_positions(
+                [], ingredient_dictionary.find_ids(allergies - previous_allergies)
+            )
+            if previous_recipes[position].dietary_flags & flags == flags
+        ]
+
+        # Add the recipes that only a removed allergen or dietary flag excluded
+        query = Suggestions.candidate_query(user, preferences)
+        added_recipes: dict[int | None, Recipe] = {}
+        for allergy in previous_allergies - allergies:
+            for recipe in database.query_recipes(**{**query,
+                                                    'must_have': query['must_have'] + [allergy]}):
+                added_recipes[recipe.recipe_id] = recipe
+        if previous_flags & ~flags:
+            for recipe in database.query_recipes(**query, lacks_diet=previous_flags):
+                added_recipes[recipe.recipe_id] = recipe
+
+        if added_recipes:
+            recipes = sorted(recipes + list(added_recipes.values()),
+                             key=lambda recipe: recipe.recipe_id or 0)
+        return recipes
+
+    def check_user_information(self, recipes: Sequence[Recipe]) -> list[Recipe]:
         """
         This method will be used as filter for the recipes
         """
-        filtered_recipes = []
-        for recipe in recipes:
-            # Vegan
-            if self.user.is_vegan:
-                if recipe.is_vegan:
-                    filtered_recipes.append(recipe)
-            # Vegetarian
-            elif self.user.is_vegetarian:
-                if recipe.is_vegetarian:
-                    filtered_recipes.append(recipe)
-            # Lactose intolerant
-            elif self.user.is_lactose_intolerant:
-                if recipe.is_lactose_free:
-                    filtered_recipes.append(recipe)
-            else:
-                filtered_recipes.append(recipe)
-
-        # Pop recipes that contain allergens
-        if len(self.user.allergies) > 0:
-            for allergen in self.user.allergies:
-                for recipe in filtered_recipes.copy():
-                    if recipe.contains(allergen):
-                        filtered_recipes.remove(recipe)
-
-        return filtered_recipes
+        return [recipes[position] for position in self.user_positions(recipes)]
+
+    def user_positions(self, recipes: Sequence[Recipe]) -> list[int]:
+        """
+        This method will return the positions of the recipes that fit the user information
+        """
+        # Dietary filtering is one integer AND on the precomputed bitmask of each recipe
+        required_flags = self.required_dietary_flags()
+        # Typed allergies also exclude the ingredients they are similar to
+        allergies = ((self.trigram_index if recipes is self.all_recipes
+                      else self.vocabulary_index(recipes)).exclude_all(self.user.allergies)
+                     if self.user.allergies else [])
+        if isinstance(recipes, RecipeCorpus):
+            # A corpus filters with boolean masks over its arrays, without creating recipe objects
+            engine = self.filter_engine if recipes is self.all_recipes else FilterEngine(recipes)
+            return engine.matching_positions(
+                required_flags=required_flags,
+                allergen_ids=ingredient_dictionary.find_ids(allergies)
+            )
+
+        positions = [
+            position for position, recipe in enumerate(recipes)
+            if recipe.dietary_flags & required_flags == required_flags
+        ]
+
+        # Pop recipes that contain allergens, in one pass over the recipes
+        if len(allergies) > 0:
+            # The ids of the recipes are looked up first, so their ingredients are known
+            id_sets = [recipes[position].ingredient_id_set for position in positions]
+            allergen_ids = frozenset(ingredient_dictionary.find_ids(allergies))
+            positions = [
+                position for position, id_set in zip(positions, id_sets)
+                if id_set.isdisjoint(allergen_ids)
+            ]
+
+        return positions
 
     def check_user_preferences(
             self,
@@ -79,9 +326,55 @@ class Suggestions():
         """
         This method will be used to check the user preferences, it will be used in the front end.
         """
-        if self.filtered_recipes is not None:
+        if self.database is None and (must_haves or should_not_haves):
+            # Resolve the typed names like the database does in query_candidates
+            must_haves = self.trigram_index.resolve_all(must_haves)
+            should_not_haves = self.trigram_index.exclude_all(should_not_haves)
+
+        if self.filtered_recipes is not None and self.database is not None:
+            # The database returns the recipes that fit the user and these preferences,
+            # of which only the recipes that fit the earlier preferences are kept
+            filtered_ids = ({recipe.recipe_id for recipe in self.filtered_recipes}
+                            if self.has_preferences else None)
+            self.all_recipes = [
+                recipe for recipe in self.query_candidates(
+                    self.database, self.user,
+                    (must_haves, should_not_haves, calorie_min_max, max_time)
+                )
+                if filtered_ids is None or recipe.recipe_id in filtered_ids
+            ]
+            self._ingredient_index = self._filter_engine = None
+            self.filtered_positions = list(range(len(self.all_recipes)))
+            self.filtered_recipes = list(self.all_recipes)
+
+        elif self.filtered_recipes is not None and isinstance(self.all_recipes, RecipeCorpus):
+            # A corpus checks all preferences at once with boolean masks
+            preferences_positions = self.filter_engine.matching_positions(
+                within=self.filtered_positions,
+                must_have_ids=ingredient_dictionary.find_ids(must_haves),
+                should_not_have_ids=ingredient_dictionary.find_ids(should_not_haves),
+                calorie_min_max=calorie_min_max,
+                max_time=max_time
+            )
+            self.filtered_positions = preferences_positions
+            self.filtered_recipes = [self.all_recipes[position]
+                                     for position in preferences_positions]
+
+        elif self.filtered_recipes is not None:
+            # The index only returns the recipes that have the must haves and not the
+            # should not haves, so only those are checked further
+            within = (None if len(self.filtered_positions) == len(self.all_recipes)
+                      else frozenset(self.filtered_positions))
+            candidate_positions = self.ingredient_index.matching_positions(
+                ingredient_dictionary.find_ids(must_haves),
+                ingredient_dictionary.find_ids(should_not_haves),
+                within
+            )
+
+            preferences_positions = []
             preferences_recipes = []
-            for recipe in self.filtered_recipes:
+            for position in candidate_positions:
+                recipe = self.all_recipes[position]
                 # Check the cooking time
                 if max_time is not None and recipe.prep_time is not None:
                     if recipe.prep_time > max_time:
@@ -92,17 +385,14 @@ class Suggestions():
                     if recipe.calories < calorie_min_max[0] or recipe.calories > calorie_min_max[1]:
                         continue
 
-                # Check the must haves
-                recipe_ingredients_names = [ingredient.name for ingredient in recipe.ingredients]
-                if any(ingredient not in recipe_ingredients_names for ingredient in must_haves):
-                    continue
-
-                # Check the should not haves
-                if any(ingredient in recipe_ingredients_names for ingredient in should_not_haves):
-                    continue
-
                 # If all conditions are met, add the recipe to the preferences_recipes list
+                preferences_positions.append(position)
                 preferences_recipes.append(recipe)
 
             # Change the filtered recipes to the preferences recipes
+            self.filtered_positions = preferences_positions
             self.filtered_recipes = preferences_recipes
+
+        # The next suggestions are a new shuffle of the new filtered recipes
+        self.has_preferences = self.filtered_recipes is not None
+        self.suggestion_pages = None
@@ -2,7 +2,6 @@
 add a user's own recipe to the database"""
 
 
-import os
 import string
 from typing import Any
 from project.back_end.ingredient import Ingredient
@@ -49,54 +48,51 @@ def save_user_recipe(
             else:
                 ingredient[i] = False
 
-    # Saving the ingredients as a list of Ingredient objects
-    ingredient_list: list[Ingredient] = []
-    for ingredient in ingredients:
-        ingredient_list.append(
-            Ingredient(
-                name=str(ingredient[0]),
-                quantity=ingredient[1],
-                unit=ingredient[2],
-                is_vegan=ingredient[3],
-                is_vegetation=ingredient[4],
-                is_lactose_free=ingredient[5]
-            )
-        )
-        # Adding the ingredients info to the database
-        db.add_new_ingredient_info(
-            ingredient[0],
-            {
-                "is_vegan": bool(ingredient[3]),
-                "is_vegetarian": bool(ingredient[4]),
-                "is_lactose_free": bool(ingredient[5])
-            }
-        )
-
     # Checking whether the recipe has at least one ingredient
-    if len(ingredient_list) < 1:
+    if len(ingredients) < 1:
         return 2
 
-    # Creating a text file for the instructions, if provided
-    if len(instructions) > 0:
-        create_instructions_file(title, instructions)
+    # Saving the ingredient info and the recipe together in one transaction
+    with db.transaction():
+        # Saving the ingredients as a list of Ingredient objects
+        ingredient_list: list[Ingredient] = []
+        for ingredient in ingredients:
+            ingredient_list.append(
+                Ingredient(
+                    name=str(ingredient[0]),
+                    quantity=ingredient[1],
+                    unit=ingredient[2],
+                    is_vegan=ingredient[3],
+                    is_vegetation=ingredient[4],
+                    is_lactose_free=ingredient[5]
+                )
+            )
+            # Adding the ingredients info to the database
+            db.add_new_ingredient_info(
+                ingredient[0],
+                {
+                    "is_vegan": bool(ingredient[3]),
+                    "is_vegetarian": bool(ingredient[4]),
+                    "is_lactose_free": bool(ingredient[5])
+                }
+            )
 
-    # Creating a Recipe object for the user's recipe and adding it to the database
-    recipe = Recipe(
-        name=title,
-        ingredients=ingredient_list,
-        prep_time=prep_time,
-        calories=calories
-    )
-    db.add_recipe(recipe)
+        # Creating a Recipe object for the user's recipe and adding it to the database
+        recipe = Recipe(
+            name=title,
+            ingredients=ingredient_list,
+            prep_time=prep_time,
+            calories=calories
+        )
+        recipe_id = db.add_recipe(recipe)
+
+    # Saving the instructions in the instruction store, if provided
+    if len(instructions) > 0:
+        create_instructions_file(db, recipe_id, instructions)
     return None
 
 
-def create_instructions_file(title: str, instructions: list[str]) -> None:
-    """Creates a text file containing
-    the provided instructions"""
-    project_folder: str = os.path.dirname(__file__)
-    file_name: str = str(title) + '.txt'
-    file_path: str = os.path.abspath(os.path.join(project_folder, 'instructions_files', file_name))
-    with open(file_path, "w", encoding="utf-8") as f:
-        for line in instructions:
-            f.write(line + "\n")
+def create_instructions_file(db: Database, recipe_id: int, instructions: list[str]) -> None:
+    """Writes the provided instructions
+    to the instruction store of the database"""
+    db.add_instructions(recipe_id, instructions)
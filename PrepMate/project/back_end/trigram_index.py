@@ -0,0 +1,129 @@
+"""This module contains the TrigramIndex class, which resolves typed names to known ingredients"""
+
+# Imports for this file
+from collections.abc import Iterable
+
+
+class TrigramIndex:
+    """This class maps every trigram (three characters of a padded word) to the positions of the
+    ingredient names that contain it, so a typed name only has to be compared with the names
+    that share a trigram with it. The similarity of two names is the number of trigrams they
+    share divided by the number of trigrams in either of them. Names that only differ in case,
+    spacing or plural form are the same name, so 'tomatoes' is 'Tomato' and 'olive  Oil' is
+    'Olive oil', while a similar name like 'Soy Cheese' for 'cheese' is only a guess"""
+    def __init__(self, names: Iterable[str], threshold: float = 0.5,
+                 exclusion_threshold: float = 0.7) -> None:
+        """Builds the index for the names, the first spelling of a casefolded name is kept"""
+        self.threshold: float = threshold
+        # Only a typo this close to a known name also excludes that name
+        self.exclusion_threshold: float = exclusion_threshold
+        self.names: list[str] = []
+        self.name_trigrams: list[frozenset[str]] = []
+        self._positions: dict[str, int] = {}
+        self.postings: dict[str, list[int]] = {}
+        for name in names:
+            key = self.key_of(name)
+            if not key or key in self._positions:
+                continue
+            position = self._positions[key] = len(self.names)
+            self.names.append(name.strip())
+            self.name_trigrams.append(self.trigrams(key))
+            for trigram in self.name_trigrams[position]:
+                self.postings.setdefault(trigram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def key_of(text: str) -> str:
+        """Returns the casefolded text with single spaces between the words"""
+        return ' '.join(text.casefold().split())
+
+    @staticmethod
+    def trigrams(text: str) -> frozenset[str]:
+        """Returns the trigrams of every word of the casefolded text, every word is padded with
+        two spaces in front and one after it, so the start of a word weighs more than its end"""
+        trigrams: set[str] = set()
+        for word in text.casefold().split():
+            padded = f'  {word} '
+            trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return frozenset(trigrams)
+
+    @staticmethod
+    def plural_forms(key: str) -> list[str]:
+        """Returns the singular and plural forms of the last word of the key"""
+        head, _, word = key.rpartition(' ')
+        forms = [word + 's', word + 'es']
+        if word.endswith('ies'):
+            forms.append(word[:-3] + 'y')
+        if word.endswith('es'):
+            forms.append(word[:-2])
+        if word.endswith('s'):
+            forms.append(word[:-1])
+        if word.endswith('y'):
+            forms.append(word[:-1] + 'ies')
+        return [f'{head} {form}' if head else form for form in forms if form]
+
+    def similarity(self, first: str, second: str) -> float:
+        """Returns the similarity of two names, 1 if they have the same trigrams"""
+        first_trigrams, second_trigrams = self.trigrams(first), self.trigrams(second)
+        if not first_trigrams or not second_trigrams:
+            return 0.0
+        shared = len(first_trigrams & second_trigrams)
+        return shared / (len(first_trigrams) + len(second_trigrams) - shared)
+
+    def canonical(self, text: str) -> str | None:
+        """Returns the known name that only differs from the text in case, spacing or plural
+        form, or None if there is none. This is a dict lookup per form, no trigrams are counted"""
+        key = self.key_of(text)
+        if not key:
+            return None
+        position = self._positions.get(key)
+        if position is None:
+            positions = [self._positions[form] for form in self.plural_forms(key)
+                         if form in self._positions]
+            position = min(positions, default=None)
+        return None if position is None else self.names[position]
+
+    def similar(self, text: str, threshold: float | None = None) -> list[str]:
+        """Returns the known names that are at least as similar to the text as the threshold,
+        the most similar first. Only the names that share a trigram with the text are compared"""
+        threshold = self.threshold if threshold is None else threshold
+        text_trigrams = self.trigrams(text)
+        shared: dict[int, int] = {}
+        for trigram in text_trigrams:
+            for candidate in self.postings.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        similar = []
+        for candidate, count in shared.items():
+            similarity = count / (len(text_trigrams) + len(self.name_trigrams[candidate]) - count)
+            if similarity >= threshold:
+                similar.append((-similarity, candidate))
+        return [self.names[candidate] for _, candidate in sorted(similar)]
+
+    def resolve(self, text: str) -> str | None:
+        """Returns the known name of the text, or the most similar known name, or None if no
+        name is at least as similar as the threshold"""
+        canonical = self.canonical(text)
+        if canonical is not None:
+            return canonical
+        return next(iter(self.similar(text)), None)
+
+    def resolve_all(self, texts: Iterable[str]) -> list[str]:
+        """Returns the known name of every text, or the text itself if it has none. Only names
+        that differ in case, spacing or plural form are resolved, so a must have is never
+        replaced by a guess"""
+        return [self.canonical(text) or text for text in texts]
+
+    def exclude_all(self, texts: Iterable[str]) -> list[str]:
+        """Returns the texts together with their known name, or else the one most similar name
+        above the exclusion threshold, so a misspelled exclusion still excludes its ingredient"""
+        excluded: dict[str, None] = {}
+        for text in texts:
+            excluded[text] = None
+            known = (self.canonical(text)
+                     or next(iter(self.similar(text, self.exclusion_threshold)), None))
+            if known is not None:
+                excluded[known] = None
+        return list(excluded)
@@ -0,0 +1,75 @@
+# pylint: disable=no-member
+"""This module contains the AsyncDatabase class, which keeps slow database work
+off the GUI thread."""
+
+
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+import shiboken6
+from PySide6.QtCore import QObject, Signal
+from project.back_end.database import Database
+
+
+class AsyncDatabase(QObject):
+    """
+    Facade that runs database calls on one dedicated worker thread. The results are
+    delivered back on the GUI thread through a Qt signal, so callbacks can safely update widgets.
+    """
+    result_ready = Signal(object, object, object)
+    query_failed = Signal(object)
+
+    def __init__(self, filename: str) -> None:
+        super().__init__()
+        self.filename = filename
+        # A single worker keeps the calls in the order in which they were submitted
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prepmate-database")
+        self.result_ready.connect(self.deliver_result)
+
+    def submit(self, function: Callable[..., Any], *args: Any,
+               callback: Callable[[Any], None] | None = None,
+               receiver: QObject | None = None) -> Future:
+        """
+        Runs function(*args) on the worker thread and passes the result to the callback
+        on the GUI thread. The result is dropped if the receiver widget (by default the
+        object the callback is bound to) was deleted in the meantime, e.g. because the user
+        already went to another window. Returns a Future that can also be waited on.
+        """
+        if receiver is None and isinstance(getattr(callback, "__self__", None), QObject):
+            receiver = getattr(callback, "__self__")
+
+        def run() -> Any:
+            try:
+                result = function(*args)
+            except Exception as error:
+                self.query_failed.emit(error)
+                raise
+            if callback is not None:
+                self.result_ready.emit(callback, receiver, result)
+            return result
+
+        return self.executor.submit(run)
+
+    def call(self, method_name: str, *args: Any,
+             callback: Callable[[Any], None] | None = None,
+             receiver: QObject | None = None) -> Future:
+        """
+        Calls a Database method on the worker thread, which uses its own connection.
+        E.g. call('retrieve_shopping_list', callback=fill_list).
+        """
+        def run_method(*method_args: Any) -> Any:
+            return getattr(Database(self.filename), method_name)(*method_args)
+
+        return self.submit(run_method, *args, callback=callback, receiver=receiver)
+
+    @staticmethod
+    def deliver_result(callback: Callable[[Any], None], receiver: QObject | None,
+                       result: Any) -> None:
+        """Passes the result to the callback, unless its receiver has been deleted."""
+        if receiver is not None and not shiboken6.isValid(receiver):
+            return
+        callback(result)
+
+    def shutdown(self) -> None:
+        """Waits for the submitted calls to finish and stops the worker thread."""
+        self.executor.shutdown(wait=True)
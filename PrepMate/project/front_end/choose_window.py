@@ -174,17 +174,17 @@ class ChooseWindow(QWidget):
         servings_int = int(self.servings.currentText())
         self.scaled_ingredients = scale_ingredients(self.recipe.ingredients, servings_int)
 
-        # Add the scaled ingredients to the shoppinglist
-        for ingredient in self.scaled_ingredients:
-            self.db.add_ingredient_to_shopping_list(ingredient)
-
-        # Save chosen meal and selected day in the database
         label_4 = QLabel("")
-        self.db.create_table_meal_plans()
-        if self.meal_plans.currentText() != "":
-            date_to_db = self.meal_plans.currentText()[5:-1] + f"-{self.current_date.year()}"
-            self.db.add_planned_meal(date_to_db, self.recipe.name)
-            label_4 = QLabel(f"This meal has been planned on {date_to_db} in your calendar!")
+        with self.db.transaction():
+            # Add the scaled ingredients to the shoppinglist
+            self.db.add_ingredients_to_shopping_list(self.scaled_ingredients)
+
+            # Save chosen meal and selected day in the database
+            self.db.create_table_meal_plans()
+            if self.meal_plans.currentText() != "":
+                date_to_db = self.meal_plans.currentText()[5:-1] + f"-{self.current_date.year()}"
+                self.db.add_planned_meal(date_to_db, self.recipe.name)
+                label_4 = QLabel(f"This meal has been planned on {date_to_db} in your calendar!")
 
         # Create a popup that confirms the ingredients have been added to the shoppinglist
         confirmation = QDialog(self)
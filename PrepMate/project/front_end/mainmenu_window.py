@@ -1,3 +1,4 @@
+# pylint: disable=too-many-instance-attributes
 """This module sets up the widget for the main menu window."""
 
 
@@ -32,12 +33,14 @@ class MainMenuWindow(QWidget):
         self.button_shop_list = QPushButton("Shopping List")
         self.button_calendar = QPushButton("Meal Plan Calendar")
         self.button_add_recipe = QPushButton("Add Recipe")
+        self.button_pending = QPushButton("Unknown Ingredients")
 
         self.button_info.clicked.connect(self.button_userinfo_clicked)
         self.button_recipes.clicked.connect(self.button_suggestions_clicked)
         self.button_shop_list.clicked.connect(self.button_shoppinglist_clicked)
         self.button_calendar.clicked.connect(self.button_calendar_clicked)
         self.button_add_recipe.clicked.connect(self.button_add_recipe_clicked)
+        self.button_pending.clicked.connect(self.button_pending_clicked)
 
         layout = QVBoxLayout(self)
         layout.addWidget(self.logo, alignment=Qt.AlignmentFlag.AlignCenter)
@@ -46,6 +49,7 @@ class MainMenuWindow(QWidget):
         layout.addWidget(self.button_shop_list)
         layout.addWidget(self.button_calendar)
         layout.addWidget(self.button_add_recipe)
+        layout.addWidget(self.button_pending)
 
     def button_userinfo_clicked(self) -> None:
         """This method redirects the user to the user information window."""
@@ -67,3 +71,7 @@ class MainMenuWindow(QWidget):
     def button_add_recipe_clicked(self) -> None:
         """This method redirects the user to the add recipe window."""
         self.prepmate_window.to_addrecipewindow()
+
+    def button_pending_clicked(self) -> None:
+        """This method redirects the user to the window for unknown ingredients."""
+        self.prepmate_window.to_pendingingredientswindow()
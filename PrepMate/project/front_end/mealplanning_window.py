@@ -10,7 +10,8 @@ class MealPlanningWindow(QWidget):
     def __init__(self, prepmate_window) -> None:
         super().__init__()
         self.prepmate_window = prepmate_window
-        self.prepmate_window.database.create_table_meal_plans()   # makes the meal_plans table
+        # makes the meal_plans table
+        self.prepmate_window.async_database.call('create_table_meal_plans')
         self.button_back_to_main = QPushButton("Back to Main Menu")
         self.button_back_to_main.clicked.connect(self.prepmate_window.to_mainmenuwindow)
 
@@ -47,5 +48,9 @@ class MealPlanningWindow(QWidget):
         self.meal_text.undo()
         date_str = (f'{self.calendar.selectedDate().day()}-{self.calendar.selectedDate().month()}-'
                     f'{self.calendar.selectedDate().year()}')
-        retrieved_date = self.prepmate_window.database.retrieve_planned_meal(date_str)
-        self.meal_text.setText(f'Your meals for {date_str}: {retrieved_date}')
+        self.meal_text.setText(f'Loading your meals for {date_str}...')
+        self.prepmate_window.async_database.call(
+            'retrieve_planned_meal', date_str,
+            callback=lambda retrieved_date: self.meal_text.setText(
+                f'Your meals for {date_str}: {retrieved_date}'),
+            receiver=self.meal_text)
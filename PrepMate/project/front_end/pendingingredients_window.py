@@ -0,0 +1,84 @@
+"""This module sets up the widget for the pending ingredients window."""
+
+
+from typing import TYPE_CHECKING
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QGroupBox, QCheckBox,
+                               QLabel, QPushButton, QMessageBox)
+from PySide6.QtCore import Qt
+if TYPE_CHECKING:
+    from project.__main__ import PrepMateWindow
+
+
+class PendingIngredientsWindow(QWidget):
+    """This class generates a window where the user fills in the dietary info of
+    all ingredients that were found in recipes but are not known in the database."""
+    def __init__(self, prepmate_window: "PrepMateWindow") -> None:
+        super().__init__()
+        self.prepmate_window = prepmate_window
+
+        # One row of checkboxes (vegan, vegetarian, lactose free) per pending ingredient
+        self.ingredient_checkboxes: dict[str, tuple[QCheckBox, QCheckBox, QCheckBox]] = {}
+
+        self.set_layout()
+
+    def set_layout(self) -> None:
+        """Method that sets the layout of the pending ingredients widget."""
+        button_back_to_main = QPushButton("Back to Main Menu")
+        button_back_to_main.clicked.connect(self.prepmate_window.to_mainmenuwindow)
+        title_text = QLabel("Unknown Ingredients")
+
+        # Group box with a line for each pending ingredient
+        pending_box = QGroupBox('Tick what applies to each ingredient')
+        self.pending_layout = QGridLayout()
+        # Show a placeholder until the ingredients are loaded on the database thread
+        self.loading_label = QLabel("Loading unknown ingredients...")
+        self.pending_layout.addWidget(self.loading_label, 0, 0)
+        self.prepmate_window.async_database.call('retrieve_pending_ingredients',
+                                                 callback=self.fill_pending_layout,
+                                                 receiver=self.loading_label)
+        pending_box.setLayout(self.pending_layout)
+
+        button_save = QPushButton("Save")
+        button_save.clicked.connect(self.button_save_clicked)
+
+        layout = QVBoxLayout()
+        layout.addWidget(button_back_to_main)
+        layout.addWidget(title_text, alignment=Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(pending_box)
+        layout.addWidget(button_save)
+        self.setLayout(layout)
+
+    def fill_pending_layout(self, pending_ingredients: list[str]) -> None:
+        """Method that replaces the placeholder by a line for every pending ingredient."""
+        self.pending_layout.removeWidget(self.loading_label)
+        self.loading_label.deleteLater()
+        if len(pending_ingredients) == 0:
+            self.pending_layout.addWidget(QLabel("All ingredients are known."), 0, 0)
+        for row, ingredient in enumerate(pending_ingredients):
+            checkboxes = (QCheckBox('Vegan'), QCheckBox('Vegetarian'), QCheckBox('Lactose-free'))
+            self.ingredient_checkboxes[ingredient] = checkboxes
+            self.pending_layout.addWidget(QLabel(ingredient), row, 0)
+            for column, checkbox in enumerate(checkboxes, start=1):
+                self.pending_layout.addWidget(checkbox, row, column)
+
+    def button_save_clicked(self) -> None:
+        """This method saves the info of all pending ingredients in the database at once."""
+        ingredient_infos = {
+            ingredient: {
+                'is_vegan': vegan.isChecked(),
+                'is_vegetarian': vegetarian.isChecked() or vegan.isChecked(),
+                'is_lactose_free': lactose_free.isChecked() or vegan.isChecked()
+            }
+            for ingredient, (vegan, vegetarian, lactose_free) in self.ingredient_checkboxes.items()
+        }
+        self.prepmate_window.async_database.call('resolve_pending_ingredients', ingredient_infos,
+                                                 callback=self.ingredients_saved, receiver=self)
+
+    def ingredients_saved(self, _result: None) -> None:
+        """This method tells the user the info is saved, once the database thread is done."""
+        pop_up_saved = QMessageBox()
+        pop_up_saved.setWindowTitle('Ingredients updated')
+        pop_up_saved.setText('The info of the unknown ingredients is saved!')
+        pop_up_saved.setStandardButtons(QMessageBox.Ok)     # type: ignore[attr-defined]
+        pop_up_saved.exec()
+        self.prepmate_window.to_mainmenuwindow()
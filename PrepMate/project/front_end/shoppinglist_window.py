@@ -68,13 +68,23 @@ class ShoppingListWindow(QWidget):
         """
         layout = QVBoxLayout()
 
-        self.checkbox_to_ingredient = []
-        lst_of_items = self.prepmate_window.database.retrieve_shopping_list()
+        # Show a placeholder until the items are loaded on the database thread
+        self.checkbox_to_ingredient: list[list] = []
+        self.loading_label = QLabel("Loading shopping list...")
+        layout.addWidget(self.loading_label)
+        self.prepmate_window.async_database.call('retrieve_shopping_list',
+                                                 callback=self.fill_list_layout,
+                                                 receiver=self.loading_label)
+        return layout
+
+    def fill_list_layout(self, lst_of_items: list[Ingredient]) -> None:
+        """Method that replaces the placeholder by a checkbox for every shopping list item."""
+        self.list_layout.removeWidget(self.loading_label)
+        self.loading_label.deleteLater()
         for item in lst_of_items:
             new_checkbox = self.create_item_checkbox(item)
-            layout.addWidget(new_checkbox)
+            self.list_layout.addWidget(new_checkbox)
             self.checkbox_to_ingredient += [[new_checkbox, item]]
-        return layout
 
     @staticmethod
     def create_item_checkbox(item: "Ingredient") -> QCheckBox:
@@ -93,7 +103,8 @@ class ShoppingListWindow(QWidget):
             if checkbox.isChecked():
                 shoppinglst_wdgt.list_layout.removeWidget(checkbox)
                 checkbox.deleteLater()
-                shoppinglst_wdgt.prepmate_window.database.delete_ingredient_from_shopping_list(item)
+                shoppinglst_wdgt.prepmate_window.async_database.call(
+                    'delete_ingredient_from_shopping_list', item)
             else:
                 new_checkbox_to_ingredient += [[checkbox, item]]
         shoppinglst_wdgt.checkbox_to_ingredient = new_checkbox_to_ingredient
@@ -110,8 +121,9 @@ class ShoppingListWindow(QWidget):
 
     def add_item_to_list(self, new_ingredient) -> None:
         """This method adds the user's new ingredient to the shopping list."""
-        self.prepmate_window.database.add_ingredient_to_shopping_list(new_ingredient)
-        # refresh the list by recreating the widget:
+        self.prepmate_window.async_database.call('add_ingredient_to_shopping_list', new_ingredient)
+        # refresh the list by recreating the widget, the database thread runs the calls in
+        # order, so the new list is only retrieved after the item is added:
         self.prepmate_window.to_shoppinglistwindow()
 
 
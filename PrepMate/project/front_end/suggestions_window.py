@@ -1,3 +1,4 @@
+# pylint: disable=too-many-instance-attributes
 """This  module contains the class for the suggestions window."""
 
 
@@ -8,6 +9,9 @@ from PySide6.QtCore import Qt
 from project.front_end.choose_window import ChooseWindow
 from project.back_end.recipe_suggestions import Suggestions
 from project.back_end.recipe import Recipe
+from project.back_end.ingredient import Ingredient
+from project.back_end.user import User
+from project.back_end.database import Database
 if TYPE_CHECKING:
     from project.__main__ import PrepMateWindow
 
@@ -52,19 +56,18 @@ class RecipeWidget(QWidget):
         recipe_object.choose_window.show()
 
 
-class SuggestionsWindow(Suggestions, QWidget):
+class SuggestionsWindow(QWidget):
     """This clas is used to display the suggestions window."""
     def __init__(self, prepmate_window: "PrepMateWindow", user_preference_info) -> None:
         """Create a window with all the
         suggestions listed under each other."""
-        Suggestions.__init__(self)
-        QWidget.__init__(self)
+        super().__init__()
         self.prepmate_window = prepmate_window
-
-        # Use the back end to create random recipe suggestions
-        if user_preference_info is not None:
-            self.check_user_preferences(*user_preference_info)
-        self.random_suggestions()
+        self.user_preference_info = user_preference_info
+        # Until the recipes are loaded there is nothing to suggest
+        self.recipe_suggestions: Suggestions | None = None
+        self.recipe_widgets: list[RecipeWidget] = []
+        self.shopping_list: list[Ingredient] = []
 
         # Create a 'back' button and a refresh button
         button_back_to_main = QPushButton("Back to Main Menu")
@@ -72,24 +75,24 @@ class SuggestionsWindow(Suggestions, QWidget):
         button_back_to_preferences = QPushButton("Back to Preferences")
         button_back_to_preferences.clicked.connect(self.prepmate_window.to_userpreferenceswindow)
         refresh_button = QPushButton("Refresh")
-        refresh_button.clicked.connect(
-            lambda: prepmate_window.to_suggestionswindow(user_preference_info))
+        refresh_button.clicked.connect(self.refresh_suggestions)
+        shopping_list_button = QPushButton("Best for Shopping List")
+        shopping_list_button.clicked.connect(self.shopping_list_suggestions)
 
-        # Create an HBoxLayout for two buttons next to each other
+        # Create an HBoxLayout for the buttons next to each other
         self.hbox = QHBoxLayout()
         self.hbox.addWidget(button_back_to_preferences)
         self.hbox.addWidget(refresh_button)
+        self.hbox.addWidget(shopping_list_button)
 
-        # Create a VBoxLayout and add the buttons to it
+        # Create a VBoxLayout and add the buttons and a placeholder to it
         self.vbox = QVBoxLayout()
         self.vbox.addWidget(button_back_to_main)
         self.vbox.addLayout(self.hbox)
-
-        # Create a widget for each recommended recipe and add it to the layout
+        self.loading_label = QLabel("Loading suggestions...")
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.vbox.addWidget(self.loading_label)
         self.widget = QWidget()
-        for recipe in self.suggestions:
-            suggestion = RecipeWidget(recipe)
-            self.vbox.addWidget(suggestion.box)
         self.widget.setLayout(self.vbox)
 
         # Create a ScrollArea and add the recipe widgets to it
@@ -98,3 +101,58 @@ class SuggestionsWindow(Suggestions, QWidget):
         self.suggestion_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)  # type: ignore
         self.suggestion_scroll.setWidgetResizable(True)
         self.suggestion_scroll.setWidget(self.widget)
+
+        # Query the user and the recipes that fit them on the database thread
+        self.prepmate_window.async_database.submit(
+            self.load_suggestion_data, self.prepmate_window.async_database.filename,
+            user_preference_info, callback=self.show_suggestions, receiver=self.widget)
+
+    @staticmethod
+    def load_suggestion_data(filename: str, user_preference_info
+                             ) -> tuple[User, list[Recipe], list[Ingredient]]:
+        """Retrieves the user, only the recipes that fit the user information and
+        preferences and the shopping list, this runs on the database thread."""
+        database = Database(filename)
+        user = database.retrieve_user_info()
+        return (user, Suggestions.query_candidates(database, user, user_preference_info),
+                database.retrieve_shopping_list())
+
+    def show_suggestions(self,
+                         suggestion_data: tuple[User, list[Recipe], list[Ingredient]]) -> None:
+        """Use the back end to create random recipe suggestions
+        and replace the placeholder by a widget for each of them."""
+        user, recipes, self.shopping_list = suggestion_data
+        # The database already applied the user information and preferences
+        self.recipe_suggestions = Suggestions(user, recipes)
+        self.recipe_suggestions.random_suggestions()
+
+        self.vbox.removeWidget(self.loading_label)
+        self.loading_label.deleteLater()
+        self.show_recipe_widgets()
+
+    def refresh_suggestions(self) -> None:
+        """Show the next page of suggestions from the recipes that are already loaded.
+        When all recipes were suggested, start again with a new shuffle."""
+        if self.recipe_suggestions is None:
+            return
+        self.recipe_suggestions.random_suggestions()
+        if not self.recipe_suggestions.suggestions:
+            self.recipe_suggestions.random_suggestions()
+        self.show_recipe_widgets()
+
+    def shopping_list_suggestions(self) -> None:
+        """Show the recipes that use most of the shopping list."""
+        if self.recipe_suggestions is None:
+            return
+        self.recipe_suggestions.ranked_suggestions(self.shopping_list)
+        self.show_recipe_widgets()
+
+    def show_recipe_widgets(self) -> None:
+        """Replace the widgets of the previous suggestions by a widget for each suggestion."""
+        for recipe_widget in self.recipe_widgets:
+            self.vbox.removeWidget(recipe_widget.box)
+            recipe_widget.box.deleteLater()
+        suggestions = self.recipe_suggestions.suggestions if self.recipe_suggestions else []
+        self.recipe_widgets = [RecipeWidget(recipe) for recipe in suggestions]
+        for recipe_widget in self.recipe_widgets:
+            self.vbox.addWidget(recipe_widget.box)
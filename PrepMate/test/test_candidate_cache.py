@@ -0,0 +1,53 @@
+"""This file contains the unit tests for the CandidateCache class."""
+
+# Imports for this file
+import unittest
+
+# Imports from this project
+from project.back_end.candidate_cache import CandidateCache
+from project.back_end.recipe import Recipe
+from project.back_end.user import User
+
+
+class TestCandidateCache(unittest.TestCase):
+    """This class contains all the unit tests related to the candidate cache."""
+    recipes = [Recipe('Pasta'), Recipe('Soup')]
+
+    def test_key_ignores_case_and_order(self) -> None:
+        """Test if profiles and preferences that filter the same recipes have the same key."""
+        key = CandidateCache.key_of(User(is_vegan=True, allergies={'Soy', 'peanuts'}),
+                                    [['Onion', 'Garlic'], [], (0, 500), 30])
+        self.assertEqual(key, CandidateCache.key_of(
+            User(is_vegan=1, allergies=['Peanuts', 'soy']),
+            (['garlic', 'onion'], [], [0, 500], 30)
+        ))
+        self.assertNotEqual(key, CandidateCache.key_of(
+            User(is_vegan=True, allergies={'Soy', 'peanuts'}), (['Onion'], [], (0, 500), 30)
+        ))
+        self.assertEqual(CandidateCache.key_of(User()),
+                         CandidateCache.key_of(User(), ([], [], None, None)))
+
+    def test_new_data_version_empties_the_cache(self) -> None:
+        """Test if the recipes are only returned for the data version they were stored with."""
+        cache = CandidateCache()
+        key = CandidateCache.key_of(User())
+        cache.put(key, self.recipes, 1)
+        cached = cache.get(key, 1)
+        assert cached is not None
+        cached.pop()
+        self.assertEqual(self.recipes, cache.get(key, 1))
+        self.assertIsNone(cache.get(key, 2))
+        self.assertEqual(0, len(cache))
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test if the least recently used key is removed when the cache is full."""
+        cache = CandidateCache(maxsize=1)
+        cache.put(CandidateCache.key_of(User()), self.recipes, 1)
+        cache.put(CandidateCache.key_of(User(is_vegan=True)), self.recipes[:1], 1)
+        self.assertEqual(1, len(cache))
+        self.assertIsNone(cache.get(CandidateCache.key_of(User()), 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
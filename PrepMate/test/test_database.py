@@ -1,13 +1,21 @@
+# pylint: disable=too-many-public-methods
 """This file contains the unit tests for all the database functions."""
 
 # Imports for this file
+import os
+import random
+import sqlite3
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 # Imports from this project
 from project.back_end.database import Database
 from project.back_end.ingredient import Ingredient
-from project.back_end.recipe import Recipe
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN, LACTOSE_FREE
 from project.back_end.user import User
+from project.back_end.recipe_suggestions import Suggestions
 
 
 class TestDatabase(unittest.TestCase):
@@ -26,6 +34,48 @@ class TestDatabase(unittest.TestCase):
         self.assertIsNotNone(db.conn)
         self.assertIsNotNone(db.cursor)
 
+    def test_databases_share_connection(self) -> None:
+        """Test if database objects for the same file and thread share one WAL connection."""
+        db_1 = self.init_db()
+        db_2 = Database('test_database.db')
+        self.assertIs(db_1.conn, db_2.conn)
+        self.assertIs(db_1.ingredient_info_cache, db_2.ingredient_info_cache)
+        self.assertEqual('wal', db_1.conn.execute('PRAGMA journal_mode').fetchone()[0])
+
+    def test_threads_share_the_caches(self) -> None:
+        """Test if a database on another thread has its own connection but the same caches,
+        so an ingredient resolved on one thread is not stale on the other."""
+        db = self.init_db()
+        db.cursor.execute("DELETE FROM calories_and_categories WHERE FoodItem = 'Thread Fruit'")
+        db.commit()
+        db.ingredient_info_cache.invalidate()
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            worker_db = worker.submit(Database, 'test_database.db').result()
+            self.assertIsNot(db.conn, worker_db.conn)
+            self.assertIs(db.ingredient_info_cache, worker_db.ingredient_info_cache)
+            self.assertIs(db.candidate_cache, worker_db.candidate_cache)
+
+            self.assertFalse(worker.submit(worker_db.get_ingredient_info,
+                                           'Thread Fruit').result()['is_vegan'])
+            db.add_new_ingredient_info('Thread Fruit', {
+                'is_vegan': True, 'is_vegetarian': True, 'is_lactose_free': True
+            })
+            self.assertTrue(worker.submit(worker_db.get_ingredient_info,
+                                          'Thread Fruit').result()['is_vegan'])
+
+    def test_rolled_back_ingredient_ids_are_not_shared(self) -> None:
+        """Test if ingredient dictionary ids are only shared once they are committed."""
+        db = self.init_db()
+        with self.assertRaises(ValueError):
+            with db.transaction():
+                db.ingredient_ids(['Rollback Root'])
+                self.assertNotIn('rollback root', db.ingredient_dictionary_ids)
+                raise ValueError
+        self.assertNotIn('rollback root', db.ingredient_dictionary_ids)
+        ingredient_id = db.ingredient_ids(['Rollback Root'])[0]
+        db.commit()
+        self.assertEqual(ingredient_id, db.ingredient_dictionary_ids['rollback root'])
+
     def test_add_and_retrieve_user_allergies(self) -> None:
         """Test if the user allergies are added and retrieved correctly."""
         db = self.init_db()
@@ -80,6 +130,53 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(shopping_list[1].quantity, 1)
         self.assertEqual(shopping_list[1].unit, 'piece')
 
+    def test_add_ingredients_to_the_shopping_list_in_one_batch(self) -> None:
+        """Test if a batch of ingredients is merged by name and unit,
+        also with the ingredients already on the shopping list."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM shopping_list')
+        db.add_ingredient_to_shopping_list(Ingredient('Onion', quantity=1, unit='piece'))
+        db.add_ingredients_to_shopping_list([
+            Ingredient('Onion', quantity=2, unit='piece'),
+            Ingredient('Onion', quantity=50, unit='g'),
+            Ingredient('Salt'),
+            Ingredient('Onion', quantity=3, unit='piece'),
+            Ingredient('Salt')
+        ])
+        shopping_list = db.retrieve_shopping_list()
+        self.assertEqual([('Onion', 6, 'piece'), ('Onion', 50, 'g'), ('Salt', 0, None)],
+                         [(ingredient.name, ingredient.quantity, ingredient.unit)
+                          for ingredient in shopping_list])
+
+    def test_ingredient_dictionary(self) -> None:
+        """Test if recipe ingredients and shopping list items refer to the same ingredient id,
+        and if the shopping list merges and deletes names regardless of their casing."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM shopping_list')
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        db.add_recipe(Recipe('Onion Soup', ingredients=[
+            Ingredient('Onion', quantity=3, unit='piece')
+        ]))
+        db.add_ingredients_to_shopping_list([
+            Ingredient('Onion', quantity=1, unit='piece'),
+            Ingredient('ONION', quantity=2, unit='piece')
+        ])
+        self.assertEqual([('Onion', 3, 'piece')],
+                         [(ingredient.name, ingredient.quantity, ingredient.unit)
+                          for ingredient in db.retrieve_shopping_list()])
+        db.cursor.execute('''
+            SELECT ingredient_dictionary.name
+            FROM ingredients
+            JOIN shopping_list ON shopping_list.ingredient_id = ingredients.ingredient_id
+            JOIN ingredient_dictionary ON ingredient_dictionary.id = ingredients.ingredient_id
+        ''')
+        self.assertEqual([('onion',)], db.cursor.fetchall())
+        self.assertEqual(db.ingredient_ids(['Onion']), db.ingredient_ids(['oNiOn']))
+
+        db.delete_ingredient_from_shopping_list(Ingredient('onion'))
+        self.assertEqual([], db.retrieve_shopping_list())
+
     def test_add_and_retrieve_recipe(self) -> None:
         """Test if the recipe is added and retrieved correctly."""
         db = self.init_db()
@@ -100,6 +197,54 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(recipe.ingredients[1].name, retrieved_recipe.ingredients[1].name)
         self.assertEqual(True, retrieved_recipe.ingredients[2].is_vegan)
 
+    def test_retrieve_multiple_recipes(self) -> None:
+        """Test if the ingredients are grouped under the right recipe when several
+        recipes are retrieved at once."""
+        db = self.init_db()
+        db.create_table_recipes()
+        db.create_table_ingredients()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        recipe_1 = Recipe('Chicken and Rice', calories=400, prep_time=25, ingredients=[
+            Ingredient('Chicken', quantity=200, unit='g'),
+            Ingredient('Onion', quantity=1, unit='piece')
+        ])
+        recipe_2 = Recipe('Nothing', calories=0, prep_time=0, ingredients=[])
+        recipe_3 = Recipe('Baked Potato', calories=300, prep_time=60, ingredients=[
+            Ingredient('potato', quantity=300, unit='g')
+        ])
+        for recipe in (recipe_1, recipe_2, recipe_3):
+            db.add_recipe(recipe)
+        retrieved_recipes = db.retrieve_recipes()
+        self.assertEqual(['Chicken and Rice', 'Nothing', 'Baked Potato'],
+                         [recipe.name for recipe in retrieved_recipes])
+        self.assertEqual(['Chicken', 'Onion'],
+                         [ingredient.name for ingredient in retrieved_recipes[0].ingredients])
+        self.assertEqual([], retrieved_recipes[1].ingredients)
+        self.assertFalse(retrieved_recipes[0].is_vegetarian)
+        self.assertTrue(retrieved_recipes[2].is_vegan)
+        self.assertIsNotNone(retrieved_recipes[2].recipe_id)
+
+    def test_add_recipes_in_bulk(self) -> None:
+        """Test if recipes streamed from a generator are all added with the right ids."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        recipes = (
+            Recipe(f'Recipe {i}', calories=100 + i, prep_time=10, ingredients=[
+                Ingredient('Onion', quantity=i, unit='piece'),
+                Ingredient('Potato', quantity=100, unit='g')
+            ])
+            for i in range(7)
+        )
+        recipe_ids = db.add_recipes(recipes, batch_size=3)
+        retrieved_recipes = db.retrieve_recipes()
+        self.assertEqual(recipe_ids, [recipe.recipe_id for recipe in retrieved_recipes])
+        self.assertEqual(list(range(recipe_ids[0], recipe_ids[0] + 7)), recipe_ids)
+        self.assertEqual(6, retrieved_recipes[6].ingredients[0].quantity)
+        self.assertEqual(14, sum(len(recipe.ingredients) for recipe in retrieved_recipes))
+        self.assertEqual([], db.add_recipes([]))
+
     def test_add_and_retrieve_new_ingredient_info(self):
         """Test if the new ingredient info is added and retrieved correctly."""
         db = self.init_db()
@@ -108,6 +253,305 @@ class TestDatabase(unittest.TestCase):
         db.add_new_ingredient_info(ingredient_name, ingredient_info)
         retrieved_ingredient_info = db.get_ingredient_info(ingredient_name)
         self.assertEqual(ingredient_info, retrieved_ingredient_info)
+        # Known, cached and unknown ingredients all give booleans
+        for info in [retrieved_ingredient_info, db.get_ingredient_info(ingredient_name),
+                     db.get_ingredient_info('unknown ingredient')]:
+            self.assertEqual({bool}, {type(value) for value in info.values()})
+
+    def test_csv_import_normalises_and_upserts(self):
+        """Test if the csv import converts the values, keeps the first row of
+        a duplicated ingredient and updates known ingredients on a new import."""
+        db = self.init_db()
+        db.cursor.execute('SELECT Cals_per100grams, KJ_per100grams, Vegan '
+                          'FROM calories_and_categories WHERE FoodItem = ?', ('Acai',))
+        self.assertEqual([(70, 294, 1)], db.cursor.fetchall())
+        self.assertFalse(db.get_ingredient_info('Liverwurst')['is_vegan'])
+        db.add_new_ingredient_info('Acai', {
+            'is_vegan': False, 'is_vegetarian': False, 'is_lactose_free': False
+        })
+        db.csv_to_database('csv_files/ingredients.csv')
+        self.assertTrue(db.get_ingredient_info('acai')['is_vegan'])
+        db.cursor.execute('SELECT COUNT(*) FROM calories_and_categories WHERE FoodItem = ?',
+                          ('Acai',))
+        self.assertEqual(1, db.cursor.fetchone()[0])
+
+    def test_csv_import_skips_rows_without_a_name(self):
+        """Test if rows with an empty or missing ingredient name are skipped."""
+        db = self.init_db()
+        db.cursor.execute("DELETE FROM calories_and_categories WHERE FoodItem = 'Csv Berry'")
+        db.commit()
+        with tempfile.TemporaryDirectory() as folder:
+            csv_path = os.path.join(folder, 'ingredients.csv')
+            with open(csv_path, 'w', encoding='utf-8', newline='') as csv_file:
+                csv_file.write(
+                    'FoodCategory,FoodItem,per100grams,Cals_per100grams,KJ_per100grams,'
+                    'Vegan,Vegetarian,LactoseFree\n'
+                    'Fruits,Csv Berry,100g,50 cal,209 kJ,TRUE,TRUE,TRUE\n'
+                    'Fruits,,100g,10 cal,42 kJ,TRUE,TRUE,TRUE\n'
+                    'Fruits,   ,100g,10 cal,42 kJ,TRUE,TRUE,TRUE\n'
+                    'Fruits\n'
+                )
+            count = db.conn.execute('SELECT COUNT(*) FROM calories_and_categories').fetchone()[0]
+            db.csv_to_database(csv_path)
+        self.assertEqual(count + 1,
+                         db.conn.execute('SELECT COUNT(*) FROM calories_and_categories')
+                         .fetchone()[0])
+        self.assertTrue(db.get_ingredient_info('Csv Berry')['is_vegan'])
+
+    def test_csv_import_wrong_format(self):
+        """Test if a csv file without the ingredient info columns is refused."""
+        db = self.init_db()
+        with self.assertRaises(ValueError):
+            db.csv_to_database('csv_files/carbs.csv')
+
+    def test_unknown_ingredients_are_queued(self):
+        """Test if adding a recipe with an unknown ingredient queues the ingredient, if loading
+        the recipe does not write and if resolving the queue updates the ingredient info."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        db.cursor.execute('DELETE FROM pending_ingredients')
+        db.cursor.execute("DELETE FROM calories_and_categories "
+                          "WHERE FoodItem = 'Mystery Fruit' COLLATE NOCASE")
+        db.ingredient_info_cache.invalidate()
+        db.add_recipe(Recipe('Fruit Salad', calories=100, prep_time=5, ingredients=[
+            Ingredient('Mystery Fruit', quantity=1, unit='piece'),
+            Ingredient('Apple', quantity=1, unit='piece')
+        ]))
+        self.assertEqual(['Mystery Fruit'], db.retrieve_pending_ingredients())
+        total_changes = db.conn.total_changes
+        recipe = db.retrieve_recipes()[0]
+        self.assertFalse(recipe.ingredients[0].is_vegan)
+        self.assertEqual(total_changes, db.conn.total_changes)
+
+        db.resolve_pending_ingredients({'mystery fruit': {
+            'is_vegan': True, 'is_vegetarian': True, 'is_lactose_free': True
+        }})
+        self.assertEqual([], db.retrieve_pending_ingredients())
+        self.assertTrue(db.retrieve_recipes()[0].is_vegan)
+
+    def test_dietary_flags(self):
+        """Test if the dietary bitmask is stored when recipes are added, can be used to filter
+        the recipes and is kept current when ingredient info changes."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        db.add_recipes([
+            Recipe('Apple Pie', ingredients=[Ingredient('Apple', quantity=2, unit='piece'),
+                                             Ingredient('butter', quantity=50, unit='g')]),
+            Recipe('Chicken Salad', ingredients=[Ingredient('Chicken', quantity=1, unit='piece'),
+                                                 Ingredient('Onion', quantity=1, unit='piece')]),
+            Recipe('Baked Apple', ingredients=[Ingredient('Apple', quantity=1, unit='piece')])
+        ])
+        db.cursor.execute('SELECT name, dietary_flags FROM recipes ORDER BY id')
+        self.assertEqual([('Apple Pie', VEGETARIAN), ('Chicken Salad', LACTOSE_FREE),
+                          ('Baked Apple', VEGAN | VEGETARIAN | LACTOSE_FREE)],
+                         db.cursor.fetchall())
+        self.assertEqual(['Apple Pie', 'Baked Apple'],
+                         [recipe.name for recipe in db.retrieve_recipes(VEGETARIAN)])
+        self.assertEqual(['Baked Apple'],
+                         [recipe.name for recipe in db.retrieve_recipes(VEGAN | LACTOSE_FREE)])
+
+        db.add_new_ingredient_info('Butter', {
+            'is_vegan': True, 'is_vegetarian': True, 'is_lactose_free': True
+        })
+        self.assertFalse(db.conn.in_transaction)
+        self.assertTrue(db.retrieve_recipes()[0].is_vegan)
+        db.csv_to_database('csv_files/ingredients.csv')
+        self.assertFalse(db.retrieve_recipes()[0].is_vegan)
+
+    def test_retrieve_recipe_corpus(self):
+        """Test if the recipe corpus holds the same recipes as retrieve_recipes."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        db.add_recipes([
+            Recipe('Apple Pie', calories=300, prep_time=60, ingredients=[
+                Ingredient('Apple', quantity=2, unit='piece'),
+                Ingredient('Butter', quantity=50, unit='g')
+            ]),
+            Recipe('Water', calories=0, prep_time=1)
+        ])
+        recipes = db.retrieve_recipes()
+        corpus = db.retrieve_recipe_corpus()
+        self.assertEqual([(recipe.name, recipe.calories, recipe.dietary_flags,
+                           len(recipe.ingredients)) for recipe in recipes],
+                         [(recipe.name, recipe.calories, recipe.dietary_flags,
+                           len(recipe.ingredients)) for recipe in corpus])
+        self.assertEqual(['Water'],
+                         [recipe.name for recipe in db.retrieve_recipe_corpus(VEGAN)])
+
+    def test_query_recipes(self):
+        """Test if the recipe query combines all filters and uses the indexes."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        db.add_recipes([
+            Recipe('Apple Pie', calories=600, prep_time=60, ingredients=[
+                Ingredient('Apple', quantity=2, unit='piece'),
+                Ingredient('Butter', quantity=50, unit='g')
+            ]),
+            Recipe('Onion Soup', calories=200, prep_time=None, ingredients=[
+                Ingredient('Onion', quantity=3, unit='piece')
+            ]),
+            Recipe('Baked Apple', calories=None, prep_time=20, ingredients=[
+                Ingredient('Apple', quantity=1, unit='piece')
+            ])
+        ])
+
+        def names(**filters) -> list[str]:
+            return [recipe.name for recipe in db.query_recipes(**filters)]
+
+        self.assertEqual(['Apple Pie', 'Onion Soup', 'Baked Apple'], names())
+        self.assertEqual(['Onion Soup', 'Baked Apple'], names(diet=VEGAN))
+        self.assertEqual(['Onion Soup', 'Baked Apple'], names(calories=(100, 300)))
+        self.assertEqual(['Onion Soup', 'Baked Apple'], names(max_prep=30))
+        self.assertEqual(['Apple Pie', 'Baked Apple'], names(must_have=['apple']))
+        self.assertEqual(['Apple Pie'], names(must_have=['Apple', 'BUTTER']))
+        self.assertEqual(['Onion Soup'], names(exclude_allergens=['Apple']))
+        self.assertEqual(['Apple Pie', 'Onion Soup'], names(must_not_have=['Carrot'], limit=2))
+        self.assertEqual(['Baked Apple'], names(must_have=['Apple'], must_not_have=['Butter'],
+                                                calories=(0, 100), max_prep=30))
+        self.assertEqual([], names(must_have=['Carrot']))
+        self.assertEqual(1, len(db.query_recipes(must_have=['Apple'])[1].ingredients))
+
+        query_plan = db.conn.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM recipes WHERE calories BETWEEN 1 AND 2').fetchall()
+        self.assertIn('idx_recipes_calories', str(query_plan))
+
+    def test_consecutive_preferences_match_the_recipes_in_memory(self):
+        """Test if suggestions that query the database keep only the recipes of the earlier
+        preferences, like suggestions on recipes in memory, also after an empty result."""
+        db = self.init_db()
+        generator = random.Random(19)
+        names = ['Onion', 'Garlic', 'Leek', 'Rice', 'Lentils', 'Pepper']
+        db.add_recipes(
+            Recipe(f'Stew {number}', prep_time=generator.randint(5, 60),
+                   ingredients=[Ingredient(name) for name in generator.sample(names, 2)])
+            for number in range(40)
+        )
+        for preference_calls in [
+            [(['Onion'], [], None, None), ([], [], None, 20)],
+            [(['Saffron'], [], None, None), ([], [], None, 20)],
+            [([], ['Rice'], None, 40), (['Pepper'], [], None, None), ([], ['Leek'], None, None)],
+            # Typed names are resolved the same way in both
+            [(['onions'], ['lentil'], None, None), ([], ['garlik'], None, 50)]
+        ]:
+            with self.subTest(preference_calls=preference_calls):
+                in_database = Suggestions(user=User(), database=db)
+                in_memory = Suggestions(user=User(), recipes=db.retrieve_recipes())
+                for preferences in preference_calls:
+                    in_database.check_user_preferences(*preferences)
+                    in_memory.check_user_preferences(*preferences)
+                    self.assertEqual(
+                        sorted(recipe.name for recipe in in_memory.filtered_recipes or []),
+                        sorted(recipe.name for recipe in in_database.filtered_recipes or [])
+                    )
+
+    def test_data_version(self):
+        """Test if changes to the recipes or ingredient info bump the data version, but not
+        the user info, and if cached suggestion candidates are only used while it stays the same."""
+        db = self.init_db()
+        versions = [db.retrieve_data_version()]
+        db.add_recipe(Recipe('Toast', ingredients=[Ingredient('Bread')]))
+        versions.append(db.retrieve_data_version())
+        db.add_new_ingredient_info('Bread', {
+            'is_vegan': True, 'is_vegetarian': True, 'is_lactose_free': True
+        })
+        versions.append(db.retrieve_data_version())
+        self.assertEqual(versions, sorted(set(versions)))
+        db.add_user_info(User())
+        self.assertEqual(versions[-1], db.retrieve_data_version())
+
+        user = User(allergies=['Jam'])
+        candidates = Suggestions.query_candidates(db, user)
+        self.assertIn('Toast', [recipe.name for recipe in candidates])
+        hits = db.candidate_cache.hits
+        self.assertEqual(candidates, Suggestions.query_candidates(db, user))
+        self.assertEqual(hits + 1, db.candidate_cache.hits)
+        # A new recipe bumps the version, so the recipes are queried again
+        db.add_recipe(Recipe('Jam Toast', ingredients=[Ingredient('Bread'), Ingredient('Jam')]))
+        self.assertEqual([recipe.name for recipe in candidates],
+                         [recipe.name for recipe in Suggestions.query_candidates(db, user)])
+        self.assertEqual(hits + 1, db.candidate_cache.hits)
+
+    def test_candidates_are_refiltered_when_the_user_changes(self):
+        """Test if changing the user info refilters the cached candidates to exactly the recipes
+        that a new query returns, and if only recipes a removed constraint excluded are queried."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM recipes')
+        db.cursor.execute('DELETE FROM ingredients')
+        names = ['Apple', 'Butter', 'Chicken', 'Onion', 'Garlic', 'Rice', 'Milk', 'Tomato']
+        generator = random.Random(5)
+        db.add_recipes(
+            Recipe(f'Recipe {number}', calories=generator.randint(100, 900),
+                   ingredients=[Ingredient(name) for name in generator.sample(names, 3)])
+            for number in range(60)
+        )
+        preferences = ([], ['Rice'], (200, 800), None)
+        users = [User(), User(allergies=['onion']), User(is_vegetarian=True, allergies=['Onion']),
+                 User(is_vegan=True, allergies=['Onion', 'garlic']), User(allergies=['Garlic']),
+                 User(is_lactose_intolerant=True), User()]
+        expected = [
+            [recipe.recipe_id for recipe in
+             db.query_recipes(**Suggestions.candidate_query(user, preferences))]
+            for user in users
+        ]
+        with patch.object(db, 'query_recipes', wraps=db.query_recipes) as query_recipes:
+            for user, expected_ids in zip(users, expected):
+                with self.subTest(user=user.__dict__):
+                    query_recipes.reset_mock()
+                    self.assertEqual(expected_ids,
+                                     [recipe.recipe_id for recipe in
+                                      Suggestions.query_candidates(db, user, preferences)])
+                    # Adding an allergy or a restriction needs no query. Vegan after vegetarian
+                    # does, since a recipe can have the vegan flag without the vegetarian flag
+                    if user in users[1:3]:
+                        self.assertEqual(0, query_recipes.call_count)
+
+    def test_typed_names_are_resolved(self):
+        """Test if typed must haves, should not haves and allergies are resolved to the
+        ingredient names of the database before the candidates are queried."""
+        db = self.init_db()
+        db.add_recipes([
+            Recipe('Tomato Soup', ingredients=[Ingredient('Tomato'), Ingredient('Onion')]),
+            Recipe('Garlic Bread', ingredients=[Ingredient('Garlic clove'), Ingredient('Bread')])
+        ])
+        index = db.retrieve_trigram_index()
+        self.assertIs(index, db.retrieve_trigram_index())
+        self.assertEqual('Tomato', index.resolve('tomatoes'))
+
+        user, preferences = Suggestions.resolve_names(
+            index, User(allergies=['garlic cloves']), (['tomatoes'], ['onions'], None, None)
+        )
+        self.assertEqual(['garlic cloves', 'Garlic clove'], user.allergies[:2])
+        self.assertEqual(['Tomato'], preferences[0])
+        self.assertEqual(['onions', 'Onion'], preferences[1][:2])
+
+        names = [recipe.name for recipe in
+                 Suggestions.query_candidates(db, User(), (['tomatoes'], [], None, None))]
+        self.assertIn('Tomato Soup', names)
+        self.assertNotIn('Garlic Bread', names)
+        names = [recipe.name for recipe in
+                 Suggestions.query_candidates(db, User(allergies=['garlic cloves']))]
+        self.assertIn('Tomato Soup', names)
+        self.assertNotIn('Garlic Bread', names)
+
+    def test_ingredient_info_cache(self):
+        """Test if repeated ingredient info lookups are served from the cache
+        and if adding new ingredient info invalidates it."""
+        db = self.init_db()
+        misses = db.ingredient_info_cache.misses
+        hits = db.ingredient_info_cache.hits
+        db.get_ingredient_info('Onion')
+        db.get_ingredient_info('onion')
+        self.assertEqual(misses + 1, db.ingredient_info_cache.misses)
+        self.assertEqual(hits + 1, db.ingredient_info_cache.hits)
+        db.add_new_ingredient_info('Onion', {
+            'is_vegan': True, 'is_vegetarian': True, 'is_lactose_free': True
+        })
+        db.get_ingredient_info('Onion')
+        self.assertEqual(misses + 2, db.ingredient_info_cache.misses)
 
     def test_add_and_retrieve_meal_plans(self):
         """Test if the planned meals are added and retrieved correctly."""
@@ -124,6 +568,89 @@ class TestDatabase(unittest.TestCase):
         date_dummy = "21-01-2024"
         self.assertEqual(db.retrieve_planned_meal(date_dummy), "")
 
+    def test_transaction_commits_once_at_the_end(self) -> None:
+        """Test if the changes in a transaction block are only visible
+        to other connections after the block has ended."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM shopping_list')
+        db.commit()
+        other_conn = sqlite3.connect(db.db_path)
+        with db.transaction():
+            db.add_ingredient_to_shopping_list(Ingredient('Onion', quantity=1, unit='piece'))
+            db.add_ingredient_to_shopping_list(Ingredient('Garlic', quantity=2, unit='piece'))
+            self.assertEqual(0, other_conn.execute(
+                'SELECT COUNT(*) FROM shopping_list').fetchone()[0])
+        self.assertEqual(2, other_conn.execute('SELECT COUNT(*) FROM shopping_list').fetchone()[0])
+        other_conn.close()
+
+    def test_transaction_rolls_back_on_error(self) -> None:
+        """Test if all the changes in a transaction block are undone when an error occurs."""
+        db = self.init_db()
+        db.cursor.execute('DELETE FROM shopping_list')
+        db.commit()
+        with self.assertRaises(ValueError):
+            with db.transaction():
+                db.add_ingredient_to_shopping_list(Ingredient('Onion', quantity=1, unit='piece'))
+                raise ValueError
+        self.assertEqual([], db.retrieve_shopping_list())
+
+    def test_migrate_existing_database(self) -> None:
+        """Test if a database with the old schema is upgraded in place."""
+        db_path = os.path.join(os.path.dirname(__file__), '..', 'project', 'back_end',
+                               'test_database_migrations.db')
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute('''CREATE TABLE recipes (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL, calories INTIGER, prep_time INTEGER)''')
+        conn.execute('''CREATE TABLE ingredients (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipe_id INTEGER NOT NULL, name TEXT NOT NULL, quantity INTIGER, unit TEXT,
+            FOREIGN KEY (recipe_id) REFERENCES lists (id))''')
+        conn.execute('''CREATE TABLE shopping_list (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL, quantity INTIGER, unit TEXT)''')
+        conn.execute("INSERT INTO shopping_list (name, quantity, unit) "
+                     "VALUES ('Onion', 1, 'piece'), ('Onion', 2, 'piece'), ('Salt', 1, NULL)")
+        conn.execute('''CREATE TABLE calories_and_categories (FoodCategory TEXT, FoodItem TEXT,
+            per100grams TEXT, Cals_per100grams TEXT, KJ_per100grams TEXT, Vegan INTEGER,
+            Vegetarian INTEGER, LactoseFree INTEGER)''')
+        conn.execute("INSERT INTO calories_and_categories VALUES "
+                     "('Vegetables', 'Onion', '100g', '40 cal', '168 kJ', 1, 1, 1), "
+                     "(NULL, 'onion', NULL, NULL, NULL, 0, 0, 0)")
+        conn.execute("INSERT INTO recipes (name, calories, prep_time) VALUES ('Soup', 200, 30), "
+                     "('Avocado and Black Bean Wrap', 450, 15), "
+                     "('Farfalle in eggplant cream sauce', 600, 30)")
+        conn.execute("INSERT INTO ingredients (recipe_id, name, quantity, unit) "
+                     "VALUES (1, 'Onion', 2, 'piece')")
+        conn.commit()
+        conn.close()
+
+        db = Database('test_database_migrations.db')
+        self.assertGreaterEqual(db.conn.execute('PRAGMA user_version').fetchone()[0], 4)
+        column_types = [column[2] for column in db.conn.execute('PRAGMA table_info(ingredients)')]
+        self.assertNotIn('INTIGER', column_types)
+        db.cursor.execute('SELECT name, quantity FROM ingredients WHERE recipe_id = 1')
+        self.assertEqual([('Onion', 2)], db.cursor.fetchall())
+        self.assertEqual([('Onion', 3, 'piece'), ('Salt', 1, None)],
+                         [(ingredient.name, ingredient.quantity, ingredient.unit)
+                          for ingredient in db.retrieve_shopping_list()])
+        self.assertTrue(db.retrieve_recipes()[0].is_vegan)
+        db.cursor.execute('SELECT Cals_per100grams FROM calories_and_categories')
+        self.assertEqual([(40,)], db.cursor.fetchall())
+        query_plan = db.conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM ingredients WHERE recipe_id = 1').fetchall()
+        self.assertIn('idx_ingredients_recipe_id', str(query_plan))
+        db.cursor.execute('SELECT COUNT(*) FROM shopping_list WHERE ingredient_id IS NULL')
+        self.assertEqual([(0,)], db.cursor.fetchall())
+        # The instruction files are packed into the store, also the one named .txtt
+        self.assertNotIn(1, db.instruction_store)
+        self.assertIn(2, db.instruction_store)
+        self.assertIn(3, db.instruction_store)
+        self.assertGreater(len(db.retrieve_recipes()[1].instructions), 0)
+        store_files = [db.instruction_store.data_path, db.instruction_store.index_path]
+        db.close()
+        for file_path in [db_path] + store_files:
+            os.remove(file_path)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,101 @@
+"""This file contains the unit tests for the FilterEngine class."""
+
+# Imports for this file
+import random
+import unittest
+import numpy as np
+
+# Imports from this project
+from project.back_end.filter_engine import FilterEngine
+from project.back_end.ingredient import Ingredient
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN
+from project.back_end.recipe_corpus import RecipeCorpus
+from project.back_end.recipe_suggestions import Suggestions
+from project.back_end.user import User
+
+
+class TestFilterEngine(unittest.TestCase):
+    """This class contains all the unit tests related to the filter engine."""
+    names = ['Onion', 'Garlic', 'Tomato', 'Pasta', 'Cheese', 'Basil', 'Rice', 'Chicken']
+
+    def init_recipes(self, count: int = 300) -> list[Recipe]:
+        """Initialize random recipes, some without calories or preparation time."""
+        generator = random.Random(23)
+        return [
+            Recipe(f'Recipe {i}',
+                   calories=generator.choice([None, generator.randint(100, 900)]),
+                   prep_time=generator.choice([None, generator.randint(5, 120)]),
+                   ingredients=[Ingredient(name, is_vegan=generator.random() < 0.8,
+                                           is_vegetarian=True, is_lactose_free=True)
+                                for name in generator.sample(self.names, 3)])
+            for i in range(count)
+        ]
+
+    def test_masks(self) -> None:
+        """Test if every condition gives the expected mask."""
+        recipes = [
+            Recipe('Pasta', calories=500, prep_time=20,
+                   ingredients=[Ingredient('Pasta', is_vegan=True, is_vegetarian=True),
+                                Ingredient('Tomato', is_vegan=True, is_vegetarian=True)]),
+            Recipe('Pizza', calories=900, prep_time=None,
+                   ingredients=[Ingredient('Tomato', is_vegan=True, is_vegetarian=True),
+                                Ingredient('Cheese', is_vegetarian=True)]),
+            Recipe('Risotto', calories=None, prep_time=45,
+                   ingredients=[Ingredient('Rice'), Ingredient('cheese')])
+        ]
+        engine = FilterEngine(recipes)
+        tomato, cheese = ingredient_dictionary.ids_of(['Tomato', 'Cheese'])
+        self.assertEqual([True, False, False], engine.diet_mask(VEGAN).tolist())
+        self.assertEqual([True, True, False], engine.diet_mask(VEGETARIAN).tolist())
+        self.assertEqual([False, True, True], engine.contains_any_mask([cheese]).tolist())
+        self.assertEqual([False, True, False],
+                         engine.contains_all_mask([cheese, tomato]).tolist())
+        self.assertEqual([True, False, True], engine.calorie_mask((400, 600)).tolist())
+        self.assertEqual([True, True, False], engine.time_mask(30).tolist())
+        self.assertEqual([1], engine.matching_positions(must_have_ids=[tomato],
+                                                        calorie_min_max=(800, 1000)))
+        self.assertEqual([2], engine.matching_positions(within=[0, 2],
+                                                        should_not_have_ids=[tomato]))
+
+    def test_corpus_engine_equals_list_engine(self) -> None:
+        """Test if an engine built from a corpus has the same arrays as one built from objects."""
+        recipes = self.init_recipes()
+        from_objects = FilterEngine(recipes)
+        from_corpus = FilterEngine(RecipeCorpus.from_recipes(recipes))
+        for attribute in ['calories', 'prep_times', 'dietary_flags']:
+            # Missing values are NaN, which this assertion treats as equal
+            np.testing.assert_array_equal(getattr(from_objects, attribute),
+                                          getattr(from_corpus, attribute))
+        self.assertEqual(
+            sorted(zip(from_objects.ingredient_recipes.tolist(),
+                       from_objects.ingredient_ids.tolist())),
+            sorted(zip(from_corpus.ingredient_recipes.tolist(),
+                       from_corpus.ingredient_ids.tolist()))
+        )
+
+    def test_suggestions_equal_the_python_filters(self) -> None:
+        """Test if suggestions on a corpus, which use the engine, give the same recipes
+        as suggestions on recipe objects."""
+        recipes = self.init_recipes()
+        corpus = RecipeCorpus.from_recipes(recipes)
+        for user, preferences in [
+            (User(), ([], [], None, None)),
+            (User(is_vegan=True, allergies=['Rice']), (['onion'], ['Basil'], (200, 800), 60)),
+            (User(allergies=['garlic', 'Cheese']), (['Tomato', 'Pasta'], [], None, 90)),
+            (User(is_vegetarian=True), ([], ['Chicken', 'Onion'], (300, 600), None))
+        ]:
+            with self.subTest(user=user.__dict__, preferences=preferences):
+                from_objects = Suggestions(user=user, recipes=recipes)
+                from_corpus = Suggestions(user=user, recipes=corpus)
+                self.assertEqual(from_objects.filtered_positions, from_corpus.filtered_positions)
+
+                from_objects.check_user_preferences(*preferences)
+                from_corpus.check_user_preferences(*preferences)
+                self.assertEqual(from_objects.filtered_positions, from_corpus.filtered_positions)
+                self.assertEqual([recipe.name for recipe in from_objects.filtered_recipes or []],
+                                 [recipe.name for recipe in from_corpus.filtered_recipes or []])
+
+
+if __name__ == '__main__':
+    unittest.main()
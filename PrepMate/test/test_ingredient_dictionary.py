@@ -0,0 +1,54 @@
+"""This file contains the unit tests for the IngredientDictionary class."""
+
+# Imports for this file
+import unittest
+
+# Imports from this project
+from project.back_end.ingredient import Ingredient
+from project.back_end.ingredient_dictionary import IngredientDictionary, ingredient_dictionary
+from project.back_end.recipe import Recipe
+
+
+class TestIngredientDictionary(unittest.TestCase):
+    """This class contains all the unit tests related to the ingredient dictionary."""
+    def test_names_are_interned_casefolded(self) -> None:
+        """Test if names that only differ in case get the same id."""
+        dictionary = IngredientDictionary()
+        self.assertEqual([0, 1, 0], dictionary.ids_of(['Onion', 'Garlic', 'ONION']))
+        self.assertEqual(2, len(dictionary))
+        self.assertEqual('garlic', dictionary.name_of(1))
+
+    def test_find_id_does_not_add_names(self) -> None:
+        """Test if looking up a new name returns -1 without adding it."""
+        dictionary = IngredientDictionary()
+        dictionary.id_of('Onion')
+        self.assertEqual([0, -1], dictionary.find_ids(['ONION', 'Saffron']))
+        self.assertEqual(1, len(dictionary))
+
+        recipe = Recipe('Onion Soup', ingredients=[Ingredient('Onion'), Ingredient('Sumac salt')])
+        self.assertTrue(recipe.contains('SUMAC SALT'))
+        dictionary_size = len(ingredient_dictionary)
+        self.assertFalse(recipe.contains('Typed allergen that no recipe has'))
+        self.assertFalse(recipe.contains_any(['Another typed allergen']))
+        self.assertEqual(dictionary_size, len(ingredient_dictionary))
+
+    def test_recipe_ingredient_ids(self) -> None:
+        """Test if a recipe holds the ids of its ingredients and uses them for contains."""
+        recipe = Recipe('Onion Soup', ingredients=[Ingredient('Onion'), Ingredient('Stock')])
+        self.assertEqual(ingredient_dictionary.ids_of(['onion', 'stock']),
+                         list(recipe.ingredient_ids))
+        self.assertTrue(recipe.contains('ONION'))
+        self.assertFalse(recipe.contains('Garlic'))
+
+    def test_recipe_contains_any(self) -> None:
+        """Test if contains_any finds any of the allergens, regardless of their casing."""
+        recipe = Recipe('Pad thai', ingredients=[Ingredient('Peanuts'), Ingredient('Shrimps')])
+        self.assertEqual(frozenset(ingredient_dictionary.ids_of(['peanuts', 'shrimps'])),
+                         recipe.ingredient_id_set)
+        self.assertTrue(recipe.contains_any(['Gluten', 'SHRIMPS']))
+        self.assertFalse(recipe.contains_any(['Gluten', 'Lactose']))
+        self.assertFalse(recipe.contains_any([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
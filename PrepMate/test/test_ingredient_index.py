@@ -0,0 +1,76 @@
+"""This file contains the unit tests for the IngredientIndex class."""
+
+# Imports for this file
+import random
+import unittest
+
+# Imports from this project
+from project.back_end.ingredient import Ingredient
+from project.back_end.ingredient_dictionary import ingredient_dictionary
+from project.back_end.ingredient_index import IngredientIndex
+from project.back_end.recipe import Recipe
+from project.back_end.recipe_corpus import RecipeCorpus
+from project.back_end.recipe_suggestions import Suggestions
+from project.back_end.user import User
+
+
+class TestIngredientIndex(unittest.TestCase):
+    """This class contains all the unit tests related to the ingredient index."""
+    names = ['Onion', 'Garlic', 'Tomato', 'Pasta', 'Cheese', 'Basil', 'Rice', 'Chicken']
+
+    def init_recipes(self, count: int = 200) -> list[Recipe]:
+        """Initialize random recipes with a few ingredients each."""
+        generator = random.Random(17)
+        return [
+            Recipe(f'Recipe {i}', calories=generator.randint(100, 900),
+                   prep_time=generator.randint(5, 120),
+                   ingredients=[Ingredient(name, is_vegan=True, is_vegetarian=True,
+                                           is_lactose_free=True)
+                                for name in generator.sample(self.names, 3)])
+            for i in range(count)
+        ]
+
+    def test_matching_positions(self) -> None:
+        """Test if must haves are intersected and should not haves are subtracted."""
+        recipes = [
+            Recipe('Pasta', ingredients=[Ingredient('Pasta'), Ingredient('Tomato')]),
+            Recipe('Pizza', ingredients=[Ingredient('Tomato'), Ingredient('Cheese')]),
+            Recipe('Risotto', ingredients=[Ingredient('Rice'), Ingredient('cheese')])
+        ]
+        index = IngredientIndex(recipes)
+        tomato, cheese, rice, garlic = ingredient_dictionary.ids_of(
+            ['Tomato', 'Cheese', 'Rice', 'Garlic'])
+        self.assertEqual([1, 2], index.matching_positions([cheese]))
+        self.assertEqual([1], index.matching_positions([cheese, tomato]))
+        self.assertEqual([1], index.matching_positions([cheese], [rice]))
+        self.assertEqual([0], index.matching_positions([], [cheese]))
+        self.assertEqual([], index.matching_positions([garlic]))
+        self.assertEqual([2], index.matching_positions([cheese], within={0, 2}))
+
+    def test_corpus_index_equals_list_index(self) -> None:
+        """Test if indexing a corpus gives the same postings as indexing recipe objects."""
+        recipes = self.init_recipes()
+        self.assertEqual(IngredientIndex(recipes).postings,
+                         IngredientIndex(RecipeCorpus.from_recipes(recipes)).postings)
+
+    def test_preferences_equal_a_full_scan(self) -> None:
+        """Test if the indexed preference filter returns the same recipes, in the same order,
+        as checking every recipe."""
+        recipes = self.init_recipes()
+        must_haves, should_not_haves = ['onion', 'Tomato'], ['Basil']
+        suggestions = Suggestions(user=User(allergies=['Rice']), recipes=recipes)
+        suggestions.check_user_preferences(must_haves, should_not_haves, (200, 800), 60)
+
+        expected = []
+        for recipe in recipes:
+            names = {ingredient.name.casefold() for ingredient in recipe.ingredients}
+            # init_recipes gives every recipe calories and a preparation time
+            assert recipe.calories is not None and recipe.prep_time is not None
+            if ('rice' not in names and {'onion', 'tomato'} <= names and 'basil' not in names
+                    and 200 <= recipe.calories <= 800 and recipe.prep_time <= 60):
+                expected.append(recipe)
+        self.assertEqual(expected, suggestions.filtered_recipes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""This file contains the unit tests for the IngredientInfoCache class."""
+
+# Imports for this file
+import unittest
+
+# Imports from this project
+from project.back_end.ingredient_info_cache import IngredientInfoCache
+
+
+class TestIngredientInfoCache(unittest.TestCase):
+    """This class contains all the unit tests related to the ingredient info cache."""
+    info = {'is_vegan': True, 'is_vegetarian': True, 'is_lactose_free': True}
+
+    def test_lookup_is_case_insensitive(self) -> None:
+        """Test if the cache finds an ingredient regardless of its casing."""
+        cache = IngredientInfoCache()
+        cache.put('Olive Oil', self.info)
+        self.assertEqual(self.info, cache.get('olive oil'))
+        self.assertEqual(1, cache.hits)
+        self.assertIsNone(cache.get('Onion'))
+        self.assertEqual(1, cache.misses)
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test if the least recently used ingredient is removed when the cache is full."""
+        cache = IngredientInfoCache(maxsize=2)
+        cache.put('Onion', self.info)
+        cache.put('Garlic', self.info)
+        cache.get('Onion')
+        cache.put('Potato', self.info)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('Garlic'))
+        self.assertIsNotNone(cache.get('Onion'))
+
+    def test_invalidate(self) -> None:
+        """Test if single ingredients and the whole cache can be invalidated."""
+        cache = IngredientInfoCache()
+        cache.put('Onion', self.info)
+        cache.put('Garlic', self.info)
+        cache.invalidate('ONION')
+        self.assertIsNone(cache.get('Onion'))
+        cache.invalidate()
+        self.assertEqual(0, len(cache))
+
+    def test_returned_info_is_a_copy(self) -> None:
+        """Test if changing the returned info does not change the cached info."""
+        cache = IngredientInfoCache()
+        cache.put('Onion', self.info)
+        cached = cache.get('Onion')
+        assert cached is not None
+        cached['is_vegan'] = False
+        self.assertEqual(self.info, cache.get('Onion'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""This file contains the unit tests for the InstructionCache class and lazy instruction loading."""
+
+# Imports for this file
+import unittest
+from unittest.mock import patch
+
+# Imports from this project
+from project.back_end.instruction_cache import InstructionCache
+from project.back_end.recipe import Recipe
+
+
+class TestInstructionCache(unittest.TestCase):
+    """This class contains all the unit tests related to the instruction cache."""
+    instructions = ['Boil the water\n', 'Add the pasta\n']
+
+    def test_cache_returns_copies(self) -> None:
+        """Test if changing the returned instructions does not change the cache."""
+        cache = InstructionCache()
+        cache.put(1, self.instructions)
+        cached = cache.get(1)
+        assert cached is not None
+        cached.append('Eat')
+        self.assertEqual(self.instructions, cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual((2, 1), (cache.hits, cache.misses))
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test if the least recently used recipe is removed when the cache is full."""
+        cache = InstructionCache(maxsize=1)
+        cache.put(1, self.instructions)
+        cache.put(2, self.instructions)
+        self.assertEqual(1, len(cache))
+        self.assertIsNone(cache.get(1))
+        cache.invalidate(2)
+        self.assertEqual(0, len(cache))
+
+    def test_instructions_are_loaded_lazily(self) -> None:
+        """Test if the instruction file is only read on first access, and only once."""
+        with patch.object(Recipe, 'get_instructions_from_file',
+                          return_value=self.instructions) as read_file:
+            recipe = Recipe('Pasta')
+            read_file.assert_not_called()
+            self.assertEqual(self.instructions, recipe.instructions)
+            self.assertEqual(self.instructions, recipe.instructions)
+            read_file.assert_called_once()
+
+    def test_recipes_share_the_instruction_cache(self) -> None:
+        """Test if a second recipe with the same id uses the shared cache instead of the file,
+        and if a recipe with the same name but another id does not."""
+        cache = InstructionCache()
+        with patch.object(Recipe, 'get_instructions_from_file',
+                          return_value=self.instructions) as read_file:
+            self.assertEqual(self.instructions,
+                             Recipe('Pasta', recipe_id=1, instruction_cache=cache).instructions)
+            self.assertEqual(self.instructions,
+                             Recipe('Pasta', recipe_id=1, instruction_cache=cache).instructions)
+            read_file.assert_called_once()
+
+            read_file.return_value = ['Bake the pasta\n']
+            self.assertEqual(['Bake the pasta\n'],
+                             Recipe('Pasta', recipe_id=2, instruction_cache=cache).instructions)
+            self.assertEqual(self.instructions, cache.get(1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""This file contains the unit tests for the InstructionStore class."""
+
+# Imports for this file
+import os
+import tempfile
+import unittest
+
+# Imports from this project
+from project.back_end.instruction_store import InstructionStore
+
+
+class TestInstructionStore(unittest.TestCase):
+    """This class contains all the unit tests related to the instruction store."""
+    instructions = ['Boil the water\n', 'Add the pasta\n', 'Cook for ten minutes\n']
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()     # pylint: disable=consider-using-with
+        self.path = os.path.join(self.folder.name, 'test.instructions')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_put_and_get(self) -> None:
+        """Test if compressed and uncompressed records are read back the same."""
+        store = InstructionStore(self.path)
+        store.put(1, self.instructions * 20)
+        store.put(2, self.instructions, compress=False)
+        store.put(3, [])
+        self.assertEqual(self.instructions * 20, store.get(1))
+        self.assertEqual(self.instructions, store.get(2))
+        self.assertEqual([], store.get(3))
+        self.assertIsNone(store.get(4))
+        self.assertLess(os.path.getsize(store.data_path), len(''.join(self.instructions)) * 21)
+        store.close()
+
+    def test_lines_without_newline(self) -> None:
+        """Test if instructions without a newline are stored as one line each."""
+        store = InstructionStore(self.path)
+        store.put(1, ['Boil the water', 'Add the pasta'])
+        self.assertEqual(['Boil the water\n', 'Add the pasta\n'], store.get(1))
+        store.close()
+
+    def test_write_after_read(self) -> None:
+        """Test if records written after the data file was mapped can be read, and if
+        a later record replaces the earlier one."""
+        store = InstructionStore(self.path)
+        store.put(1, self.instructions)
+        self.assertEqual(self.instructions, store.get(1))
+        store.put(2, ['Slice the bread\n'])
+        store.put(1, ['Order a pizza\n'])
+        self.assertEqual(['Slice the bread\n'], store.get(2))
+        self.assertEqual(['Order a pizza\n'], store.get(1))
+        self.assertEqual(2, len(store))
+        store.close()
+
+    def test_reopen(self) -> None:
+        """Test if the index is read back when the store is opened again."""
+        store = InstructionStore(self.path)
+        store.put(5, self.instructions)
+        store.put(5, ['Order a pizza\n'])
+        store.close()
+        reopened = InstructionStore(self.path)
+        self.assertIn(5, reopened)
+        self.assertNotIn('5', reopened)
+        self.assertEqual(['Order a pizza\n'], reopened.get(5))
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""This file contains the unit tests for the LRUCache class."""
+
+# Imports for this file
+import threading
+import unittest
+
+# Imports from this project
+from project.back_end.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """This class contains all the unit tests related to the LRU cache."""
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test if getting a key makes it the most recently used one."""
+        cache: LRUCache[str, int] = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((1, 3), (cache.get('a'), cache.get('c')))
+        self.assertEqual((3, 1), (cache.hits, cache.misses))
+        cache.invalidate('a')
+        self.assertEqual(1, len(cache))
+        cache.invalidate()
+        self.assertEqual(0, len(cache))
+
+    def test_threads_share_the_cache(self) -> None:
+        """Test if the cache stays consistent when several threads use it at once."""
+        cache: LRUCache[int, int] = LRUCache(maxsize=50)
+
+        def use_cache(offset: int) -> None:
+            for number in range(2000):
+                cache.put((offset + number) % 100, number)
+                cache.get(number % 100)
+
+        threads = [threading.Thread(target=use_cache, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(50, len(cache))
+        self.assertEqual(8000, cache.hits + cache.misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
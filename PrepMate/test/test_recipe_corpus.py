@@ -0,0 +1,84 @@
+"""This file contains the unit tests for the RecipeCorpus class."""
+
+# Imports for this file
+import unittest
+
+# Imports from this project
+from project.back_end.ingredient import Ingredient
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN, LACTOSE_FREE
+from project.back_end.recipe_corpus import RecipeCorpus
+from project.back_end.recipe_suggestions import Suggestions
+from project.back_end.user import User
+
+
+class TestRecipeCorpus(unittest.TestCase):
+    """This class contains all the unit tests related to the recipe corpus."""
+    def init_recipes(self) -> list[Recipe]:
+        """Initialize the recipes to put in a corpus."""
+        apple = Ingredient('Apple', quantity=2, unit='piece',
+                           is_vegan=True, is_vegetarian=True, is_lactose_free=True)
+        butter = Ingredient('Butter', quantity=0.5, unit='g',
+                            is_vegan=False, is_vegetarian=True, is_lactose_free=False)
+        chicken = Ingredient('Chicken', quantity=None, unit=None,
+                             is_vegan=False, is_vegetarian=False, is_lactose_free=True)
+        return [
+            Recipe('Apple Pie', recipe_id=1, calories=300, prep_time=60,
+                   ingredients=[apple, butter]),
+            Recipe('Roast Chicken', recipe_id=2, calories=None, prep_time=90,
+                   ingredients=[chicken]),
+            Recipe('Baked Apple', recipe_id=3, calories=100, prep_time=None,
+                   ingredients=[apple]),
+            Recipe('Water', recipe_id=4, calories=0, prep_time=1)
+        ]
+
+    def test_round_trip(self) -> None:
+        """Test if recipes read back from the corpus equal the recipes put in."""
+        recipes = self.init_recipes()
+        corpus = RecipeCorpus.from_recipes(recipes)
+        self.assertEqual(4, len(corpus))
+        self.assertEqual([0, 2, 3, 4, 4], list(corpus.ingredient_offsets))
+        self.assertEqual(['Apple', 'Butter', 'Chicken'], corpus.ingredient_names)
+        for recipe, stored_recipe in zip(recipes, corpus):
+            self.assertEqual(
+                (recipe.recipe_id, recipe.name, recipe.calories, recipe.prep_time,
+                 recipe.dietary_flags),
+                (stored_recipe.recipe_id, stored_recipe.name, stored_recipe.calories,
+                 stored_recipe.prep_time, stored_recipe.dietary_flags)
+            )
+            self.assertEqual(
+                [(ingredient.name, ingredient.quantity, ingredient.unit, ingredient.is_vegan)
+                 for ingredient in recipe.ingredients],
+                [(ingredient.name, ingredient.quantity, ingredient.unit, ingredient.is_vegan)
+                 for ingredient in stored_recipe.ingredients]
+            )
+        self.assertEqual('Water', corpus[-1].name)
+        self.assertEqual(['Roast Chicken', 'Baked Apple'],
+                         [recipe.name for recipe in corpus[1:3]])
+        with self.assertRaises(IndexError):
+            corpus[4]       # pylint: disable=pointless-statement
+
+    def test_matching_positions(self) -> None:
+        """Test if the corpus filters on dietary flags and excluded ingredients."""
+        corpus = RecipeCorpus.from_recipes(self.init_recipes())
+        self.assertEqual([0, 2, 3], corpus.matching_positions(VEGETARIAN))
+        self.assertEqual([2, 3], corpus.matching_positions(VEGAN | LACTOSE_FREE))
+        self.assertEqual([1, 3], corpus.matching_positions(0, ['apple']))
+
+    def test_works_with_suggestions(self) -> None:
+        """Test if suggestions filter a corpus the same way as a list of recipes."""
+        recipes = self.init_recipes()
+        corpus = RecipeCorpus.from_recipes(recipes)
+        for user in [User(), User(is_vegetarian=True), User(is_lactose_intolerant=True),
+                     User(allergies=['Apple'])]:
+            from_list = Suggestions(user=user, recipes=recipes)
+            from_corpus = Suggestions(user=user, recipes=corpus)
+            from_list.check_user_preferences([], [], (0, 500), 60)
+            from_corpus.check_user_preferences([], [], (0, 500), 60)
+            assert from_list.filtered_recipes is not None
+            assert from_corpus.filtered_recipes is not None
+            self.assertEqual([recipe.name for recipe in from_list.filtered_recipes],
+                             [recipe.name for recipe in from_corpus.filtered_recipes])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,6 @@
 
 import unittest
 import os
-import pathlib as pl
 from project.back_end.database import Database
 from project.back_end.save_user_recipe import save_user_recipe, create_instructions_file
 from project.back_end.recipe import Recipe
@@ -162,19 +161,23 @@ class TestSaveUserRecipe(unittest.TestCase):
         self.assertEqual(len(test_val[5]), len(db.retrieve_recipes()))
 
     def test_create_instructions_file(self) -> None:
-        """Test if the instructions file has been created successfully."""
-        test_val = self.init_test_values()
-        test_instructions: list[str] = ['test_instructions_step1', 'test_instructions_step2']
-        create_instructions_file(str(test_val[0]), test_instructions)
-        project_folder: str = os.path.dirname(__file__)
-        file_name: str = str(test_val[0]) + '.txt'
-        file_path: str = os.path.abspath(os.path.join(
-            project_folder[0:-4], 'project', 'back_end', 'instructions_files', file_name
+        """Test if the instructions have been written to the instruction store successfully."""
+        db = self.init_db()
+        recipe_id = db.add_recipe(Recipe(
+            'test-recipe', ingredients=[Ingredient('Onion', quantity=1, unit='piece')]
         ))
-        path = pl.Path(file_path)
-        self.assertTrue(path.is_file())
-        self.assertTrue(path.parent.is_dir())
-        os.remove(file_path)
+        test_instructions: list[str] = ['test_instructions_step1', 'test_instructions_step2']
+        create_instructions_file(db, recipe_id, test_instructions)
+        expected_instructions = ['test_instructions_step1\n', 'test_instructions_step2\n']
+        self.assertEqual(expected_instructions, db.instruction_store.get(recipe_id))
+        recipe = [recipe for recipe in db.retrieve_recipes() if recipe.recipe_id == recipe_id][0]
+        self.assertEqual(expected_instructions, recipe.instructions)
+
+        store_files = [db.instruction_store.data_path, db.instruction_store.index_path]
+        db.close()
+        for store_file in store_files:
+            self.assertTrue(os.path.isfile(store_file))
+            os.remove(store_file)
 
 
 if __name__ == '__main__':
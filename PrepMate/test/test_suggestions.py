@@ -3,7 +3,7 @@
 # Imports from this project
 from project.back_end.recipe_suggestions import Suggestions
 from project.back_end.user import User
-from project.back_end.recipe import Recipe
+from project.back_end.recipe import Recipe, VEGAN, VEGETARIAN, LACTOSE_FREE
 from project.back_end.ingredient import Ingredient
 
 # All ingredients for testing
@@ -130,6 +130,17 @@ def test_suggestions_6() -> None:
     assert suggestions6.filtered_recipes == [italian_salad]
 
 
+def test_dietary_flags() -> None:
+    """This test will check if the dietary bitmask of a recipe is computed from its ingredients,
+    and if a bitmask passed in by the database is used as is"""
+    assert fries_and_nuggets.dietary_flags == 0
+    assert scramled_eggs.dietary_flags == VEGETARIAN | LACTOSE_FREE
+    assert pancakes.dietary_flags == VEGETARIAN
+    assert italian_salad.dietary_flags == VEGAN | VEGETARIAN | LACTOSE_FREE
+    stored_recipe = Recipe(name="Stored", ingredients=[eggs], dietary_flags=VEGAN)
+    assert stored_recipe.is_vegan and not stored_recipe.is_vegetarian
+
+
 def test_random_1() -> None:
     """This test will check if the random_suggestions method works in the Suggestions class"""
     random_user = User()
@@ -346,3 +357,117 @@ def test_check_user_preferences_multiple_preferences():
                                     pancakes,
                                     ragu_bolognese
     ]
+
+
+def test_random_pages_without_repeats() -> None:
+    """This test will check if the random_suggestions method suggests every recipe once,
+    in pages of 10, before it starts again"""
+    recipes = [Recipe(name=f"Recipe {number}", ingredients=[flour]) for number in range(25)]
+    suggestions = Suggestions(user=User(), recipes=recipes)
+    pages = []
+    for _ in range(4):
+        suggestions.random_suggestions()
+        pages.append(suggestions.suggestions)
+    assert [len(page) for page in pages] == [10, 10, 5, 0]
+    assert {recipe.name for page in pages for recipe in page} == {recipe.name for recipe in recipes}
+    suggestions.random_suggestions()
+    assert len(suggestions.suggestions) == 10
+
+
+def test_sample_pages_restart_after_new_preferences() -> None:
+    """This test will check if new preferences start a new shuffle of the remaining recipes"""
+    suggestions = Suggestions(user=User(),
+                              recipes=[
+                                  fries_and_nuggets,
+                                  scramled_eggs,
+                                  pancakes,
+                                  italian_salad,
+                                  pad_thai,
+                                  ragu_bolognese
+                              ])
+    suggestions.random_suggestions()
+    suggestions.check_user_preferences(["Eggs"], [], None, None)
+    suggestions.random_suggestions()
+    assert sorted(recipe.name for recipe in suggestions.suggestions) == ["Pancakes",
+                                                                        "Scrambled eggs"]
+    assert [len(page) for page in suggestions.sample_pages(page_size=1)] == [1, 1]
+
+
+def test_ranked_suggestions() -> None:
+    """This test will check if the ranked_suggestions method puts the recipes that use most
+    of the shopping list first, and only suggests recipes that use something from it"""
+    suggestions = Suggestions(user=User(),
+                              recipes=[
+                                  fries_and_nuggets,
+                                  scramled_eggs,
+                                  pancakes,
+                                  italian_salad,
+                                  pad_thai,
+                                  ragu_bolognese
+                              ])
+    shopping_list = [Ingredient(name="eggs", quantity=6), Ingredient(name="Milk", quantity=1),
+                     Ingredient(name="Tomatoes", quantity=20, unit="g")]
+    suggestions.ranked_suggestions(shopping_list)
+    # Eggs and milk weigh more than 20 g of tomatoes, one ingredient weighs less
+    assert suggestions.suggestions == [pancakes, italian_salad, scramled_eggs]
+    suggestions.ranked_suggestions(shopping_list, k=1)
+    assert suggestions.suggestions == [pancakes]
+
+    suggestions.check_user_preferences([], ["Tomatoes"], None, None)
+    suggestions.ranked_suggestions(shopping_list)
+    assert suggestions.suggestions == [pancakes, scramled_eggs]
+
+
+def test_seeded_suggestions_are_reproducible() -> None:
+    """This test will check if suggestions with the same seed give the same pages, and if
+    the recorded page seeds replay the same pages"""
+    recipes = [Recipe(name=f"Recipe {i}") for i in range(25)]
+
+    def pages(suggestions: Suggestions) -> list[list[str]]:
+        result = []
+        suggestions.random_suggestions()
+        while suggestions.suggestions:
+            result.append([recipe.name for recipe in suggestions.suggestions])
+            suggestions.random_suggestions()
+        return result
+
+    seeded = Suggestions(user=User(), recipes=recipes, seed=42)
+    recorded = pages(seeded)
+    page_seeds = list(seeded.page_seeds)
+    assert [len(page) for page in recorded] == [10, 10, 5]
+    assert len(page_seeds) == 3
+    assert pages(Suggestions(user=User(), recipes=recipes, seed=42)) == recorded
+    # The generator of seeded moved on, so a new shuffle is different
+    assert pages(seeded) != recorded
+
+    seeded.replay_suggestions(page_seeds)
+    assert [recipe.name for recipe in seeded.suggestions] == recorded[0]
+    assert pages(seeded)[:2] == recorded[1:]
+
+
+def test_exclusions_only_exclude_their_own_ingredient() -> None:
+    """This test will check if a should not have or allergy doesn't exclude recipes with
+    other ingredients that share a word with it"""
+    curry = Recipe(name="Curry", ingredients=[Ingredient(name="Vegetable oil"),
+                                              Ingredient(name="Peanut butter")])
+    soup = Recipe(name="Soup", ingredients=[Ingredient(name="Vegetable broth"),
+                                            Ingredient(name="Butter")])
+    suggestions = Suggestions(user=User(allergies=["Butter"]), recipes=[curry, soup])
+    assert suggestions.filtered_recipes == [curry]
+    suggestions = Suggestions(user=User(), recipes=[curry, soup])
+    suggestions.check_user_preferences([], ["Vegetable broth"], None, None)
+    assert suggestions.filtered_recipes == [curry]
+
+
+def test_new_ingredients_are_found_by_name() -> None:
+    """This test will check if allergies and the shopping list find ingredients that no
+    recipe used before, without adding the typed names that no recipe has"""
+    stew = Recipe(name="Stew", ingredients=[Ingredient(name="Kohlrabi"), onion])
+    salad = Recipe(name="Salad", ingredients=[Ingredient(name="Purslane"), onion])
+    suggestions = Suggestions(user=User(allergies=["kohlrabi"]), recipes=[stew, salad])
+    assert suggestions.filtered_recipes == [salad]
+    suggestions = Suggestions(user=User(), recipes=[Recipe(name="Stew", ingredients=[
+        Ingredient(name="Samphire"), onion
+    ]), salad])
+    suggestions.ranked_suggestions([Ingredient(name="SAMPHIRE", quantity=1)])
+    assert [recipe.name for recipe in suggestions.suggestions] == ["Stew"]
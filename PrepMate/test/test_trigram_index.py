@@ -0,0 +1,73 @@
+"""This file contains the unit tests for the TrigramIndex class."""
+
+# Imports for this file
+import unittest
+
+# Imports from this project
+from project.back_end.trigram_index import TrigramIndex
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """This class contains all the unit tests related to the trigram index."""
+    names = ['Tomato', 'Olive oil', 'Garlic clove', 'Chicken', 'Broccoli', 'Spring onion',
+             'Onion', 'Cherry tomato', 'olive OIL', 'Soy Cheese', 'Soy Oil', 'Soy Nuts',
+             'Blue cheese', 'Berry']
+
+    def test_trigrams(self) -> None:
+        """Test if every word is padded and split into trigrams."""
+        self.assertEqual({'  e', ' eg', 'egg', 'gg '}, TrigramIndex.trigrams('Egg'))
+        self.assertEqual(TrigramIndex.trigrams('olive oil'), TrigramIndex.trigrams(' OLIVE  Oil'))
+        self.assertEqual(frozenset(), TrigramIndex.trigrams('   '))
+
+    def test_canonical(self) -> None:
+        """Test if only names that differ in case, spacing or plural form are the same name."""
+        index = TrigramIndex(self.names)
+        # The second spelling of olive oil is not a new name
+        self.assertEqual(13, len(index))
+        self.assertEqual('Olive oil', index.canonical('olive  Oil'))
+        self.assertEqual('Tomato', index.canonical('tomatoes'))
+        self.assertEqual('Cherry tomato', index.canonical('cherry tomatoes'))
+        self.assertEqual('Garlic clove', index.canonical('garlic cloves'))
+        self.assertEqual('Onion', index.canonical('onions'))
+        self.assertEqual('Berry', index.canonical('berries'))
+        for text in ['cheese', 'soy', 'nuts', 'chiken', '']:
+            with self.subTest(text=text):
+                self.assertIsNone(index.canonical(text))
+
+    def test_similar(self) -> None:
+        """Test if similar names are found, the most similar first."""
+        index = TrigramIndex(self.names)
+        self.assertEqual(['Chicken'], index.similar('chiken'))
+        self.assertEqual(['Broccoli'], index.similar('brocoli'))
+        self.assertEqual('Soy Cheese', index.resolve('cheese'))
+        self.assertEqual(['Soy Nuts'], index.similar('nuts'))
+        self.assertEqual([], index.similar('Peanuts'))
+        self.assertIsNone(index.resolve('Peanuts'))
+
+    def test_threshold(self) -> None:
+        """Test if a higher threshold only finds more similar names."""
+        self.assertGreaterEqual(TrigramIndex(self.names).similarity('chiken', 'Chicken'), 0.5)
+        self.assertEqual(1.0, TrigramIndex(self.names).similarity('Tomato', 'tomato'))
+        self.assertEqual([], TrigramIndex(self.names, threshold=0.9).similar('chiken'))
+        self.assertEqual('Tomato', TrigramIndex(self.names, threshold=0.9).resolve('tomatoes'))
+
+    def test_resolve_all(self) -> None:
+        """Test if must haves are only replaced by the same name, never by a guess."""
+        index = TrigramIndex(self.names)
+        self.assertEqual(['Tomato', 'cheese', 'soy', 'nuts', 'Peanuts'],
+                         index.resolve_all(['tomatoes', 'cheese', 'soy', 'nuts', 'Peanuts']))
+
+    def test_exclude_all(self) -> None:
+        """Test if exclusions keep the typed name next to the same name, or only a very similar
+        name for a typo, and never exclude other ingredients that share words with them."""
+        index = TrigramIndex(self.names + ['Vegetable broth', 'Vegetable oil', 'Butter',
+                                           'Peanut butter', 'Vegan butter', 'Buttermilk',
+                                           'Milk', 'Soy Milk', 'Rice Milk'])
+        self.assertEqual(['Vegetable broth'], index.exclude_all(['Vegetable broth']))
+        self.assertEqual(['butter', 'Butter'], index.exclude_all(['butter']))
+        self.assertEqual(['Milk'], index.exclude_all(['Milk']))
+        self.assertEqual(['brocoli', 'Broccoli', 'tomatoes', 'Tomato', 'chiken', 'Peanuts'],
+                         index.exclude_all(['brocoli', 'tomatoes', 'chiken', 'Peanuts']))
+
+if __name__ == '__main__':
+    unittest.main()